@@ -0,0 +1,175 @@
+# GM328A Case - headless batch build and export
+#
+# Builds the parts of the boxes described in a parameter file and writes them
+# as STL/3MF/STEP files, without any viewer (ocp_vscode, FreeCAD, Blender).
+#
+#   python gm328a_build.py gm328a_parameters.json --output out --formats stl 3mf
+#   python gm328a_build.py --boxes case --parts top_solid --workers 1
+#   python gm328a_build.py --boxes case --parts wall_solid --profile
+#   python gm328a_build.py --trace gm328a.trace.json
+#   python gm328a_build.py --boxes case --parts top_solid --daemon   (see parametric_daemon.py)
+#
+# The model modules (and build123d) are imported when needed: with --daemon
+# this process is a thin client, the daemon builds and exports.
+import argparse
+import concurrent.futures
+import json
+import os
+import time
+
+FORMATS = ("stl", "3mf", "step")
+DEFAULT_PARAMETERS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gm328a_parameters.json")
+
+
+def _build_and_export(box, part, paths, trace=False):
+    # runs in the worker process: build, export and report timings
+    import parametric_case as pc
+    import parametric_profiling as prof
+    if trace:
+        (t_build, t_export), events = prof.run_traced(_build_and_export, box, part, paths)
+        return t_build, t_export, events
+    start = time.perf_counter()
+    solid = getattr(box, part)()
+    t_build = time.perf_counter() - start
+    start = time.perf_counter()
+    for path in paths:
+        pc.export_part(solid, path)
+    return t_build, time.perf_counter() - start
+
+
+def build_and_export(boxes, parts=None, formats=("stl",), output=".", max_workers=None, trace=None):
+    """
+    Build the selected parts of each box and export them, in a process pool.
+
+    Parameters:
+    boxes (dict): name -> box instance.
+    parts (list): part method names (default: box.part_names).
+    formats (list): export formats, any of FORMATS.
+    output (str): output directory, files are named <box>_<part>.<format>.
+    max_workers (int): number of worker processes; 1 runs in this process.
+    trace (parametric_profiling.build_trace): optional, receives the job spans and
+                                         the events recorded in the workers.
+
+    Returns:
+    list: (box name, part, build seconds, export seconds, paths) per part.
+    """
+    os.makedirs(output, exist_ok=True)
+    jobs = []
+    for name, box in boxes.items():
+        for part in (parts or box.part_names):
+            if part not in box.part_names:
+                raise ValueError(f"{name} ({type(box).__name__}) has no part {part}")
+            paths = [os.path.join(output, f"{name}_{part}.{fmt}") for fmt in formats]
+            jobs.append((name, box, part, paths))
+
+    results = []
+    if max_workers == 1:
+        for name, box, part, paths in jobs:
+            start = time.perf_counter()
+            if trace is not None:
+                with trace:
+                    timing = _build_and_export(box, part, paths)
+                trace.span(f"{name}.{part}", "job", start * 1e6, trace.now())
+            else:
+                timing = _build_and_export(box, part, paths)
+            results.append((name, part) + timing + (paths,))
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        submitted = time.perf_counter() * 1e6
+        futures = {pool.submit(_build_and_export, box, part, paths, trace is not None): (name, part, paths)
+                   for name, box, part, paths in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            name, part, paths = futures[future]
+            t_build, t_export, *events = future.result()
+            results.append((name, part, t_build, t_export, paths))
+            if trace is not None:
+                trace.span(f"{name}.{part}", "job", submitted, trace.now())
+                trace.events.extend(events[0])
+    return results
+
+
+def daemon_build_and_export(boxes, parts=None, formats=("stl",), output="."):
+    """
+    Build and export the selected parts of each box in the running build
+    daemon (see parametric_daemon.py); this process only sends the parameters.
+
+    Parameters:
+    boxes (dict): name -> plain parameters (see parametric_case.box_from_parameters).
+    parts (list): part method names (default: all parts of each box).
+
+    Returns:
+    list: (box name, part, build seconds, export seconds, paths) per part.
+    """
+    from parametric_client import daemon_client
+    results = []
+    with daemon_client() as daemon:
+        for name, parameters in boxes.items():
+            paths = [os.path.join(output, f"{name}_{{part}}.{fmt}") for fmt in formats]
+            for part, exported in daemon.export(parameters, name, paths, parts).items():
+                results.append((name, part, exported["build"], exported["export"], exported["paths"]))
+    return results
+
+
+def print_summary(results, elapsed):
+    print(f"{'box':<12}{'part':<22}{'build (s)':>10}{'export (s)':>12}")
+    for name, part, t_build, t_export, _ in sorted(results):
+        print(f"{name:<12}{part:<22}{t_build:>10.2f}{t_export:>12.2f}")
+    total = sum(r[2] + r[3] for r in results)
+    print(f"{len(results)} parts, {total:.2f}s of work in {elapsed:.2f}s wall time")
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and export GM328A case parts without a viewer.")
+    parser.add_argument("parameters", nargs="?", default=DEFAULT_PARAMETERS, help="JSON parameter file")
+    parser.add_argument("--boxes", nargs="+", help="boxes to build (default: all in the parameter file)")
+    parser.add_argument("--parts", nargs="+", help="part methods to build (default: all parts of each box)")
+    parser.add_argument("--formats", nargs="+", default=["stl"], choices=FORMATS)
+    parser.add_argument("--output", default=".", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of cores)")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the part cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="count and time the geometry operations (builds in this process, without cache)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a trace-event timeline of the build (Perfetto, chrome://tracing)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="build in the running build daemon (parametric_daemon.py serve)")
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        with open(args.parameters) as f:
+            boxes = json.load(f)                    # plain parameters, sent to the daemon
+    else:
+        import parametric_case as pc
+        if args.no_cache:
+            os.environ["PARAMETRIC_CASE_CACHE_DISABLE"] = "1"   # also seen by spawned workers
+            pc.PART_CACHE.enabled = False
+        boxes = pc.load_parameter_file(args.parameters)
+    if args.boxes:
+        unknown = set(args.boxes) - set(boxes)
+        if unknown:
+            parser.error(f"unknown boxes: {', '.join(sorted(unknown))}")
+        boxes = {name: boxes[name] for name in args.boxes}
+
+    start = time.perf_counter()
+    if args.profile:
+        import parametric_profiling as prof
+        with prof.geometry_profiler() as profiler:
+            results = build_and_export(boxes, args.parts, args.formats, args.output, max_workers=1)
+        print(profiler.report())
+    elif args.daemon:
+        results = daemon_build_and_export(boxes, args.parts, args.formats, args.output)
+    elif args.trace:
+        import parametric_profiling as prof
+        trace = prof.build_trace()
+        results = build_and_export(boxes, args.parts, args.formats, args.output, args.workers, trace)
+        trace.save(args.trace)
+    else:
+        results = build_and_export(boxes, args.parts, args.formats, args.output, args.workers)
+    print_summary(results, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,433 @@
+# GM328A Case - benchmarks for the parametric box hot paths
+#
+# Suite: every part method of the reference configurations, plus the path
+# chaining and the fillet sweep on their own. Each benchmark runs in a fresh
+# process (cold caches, meaningful peak RSS); results are appended to a
+# history file and compared with the previous runs.
+#
+#   python parametric_bench.py                      # run the suite
+#   python parametric_bench.py --filter gm328a_case # only matching benchmarks
+#   python parametric_bench.py --compare            # strategy comparisons
+#   python parametric_bench.py --filter import      # import times, against --import-budget
+import argparse
+import concurrent.futures
+import datetime
+import json
+import math
+import os
+import pickle
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import build123d as bd
+import parametric_case as pc
+import parametric_parallel as pp
+
+
+#*******************
+# REFERENCE CONFIGURATIONS
+#*******************
+def _gm328a_dimensions(dx):
+    # dimensions as computed by the VSCode script, dx is the external length
+    clearance_xy, clearance_z, shell = 0.2, 0.2, 2
+    dy, dz = 63.8, (1.52+15.1+4+2)
+    return {"dim_top":    [dx, dy+2*(shell+clearance_xy)+shell, shell],
+            "dim_bottom": [dx, dy+2*(shell+clearance_xy)+shell, shell],
+            "dim_wall":   [shell, shell, dz - 2*shell - 2*clearance_z],
+            "clearance":  [clearance_xy, clearance_xy, clearance_z]}
+
+
+REFERENCE_CONFIGS = {
+    "gm328a_case":    dict(_gm328a_dimensions(78.7+2*(2+0.2)+2), **{"class": "gm328A_case"}),
+    "gm328a_battery": dict(_gm328a_dimensions(26+4*(2+0.2)+2+2*0.2), **{"class": "gm328A_battery"}),
+    "box_60x40":      {"class": "parametric_box", "dim_top": [60, 40, 2], "dim_bottom": [60, 40, 2],
+                       "dim_wall": [2, 2, 20], "clearance": [0.2, 0.2, 0.2]},
+}
+
+
+def gm328a_case_reference():
+    """
+    GM328A case with the exact dimensions used by the VSCode script.
+    """
+    return pc.box_from_parameters(REFERENCE_CONFIGS["gm328a_case"])
+
+
+def _best_of(function, repeat):
+    # best wall time of several runs, and the result of the last one
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+#*******************
+# BENCHMARK SUITE
+#*******************
+def _part_benchmark(config, part):
+    def run():
+        # fresh box and fillet engine: nothing memoized from a previous repeat
+        pc.FILLET_ENGINE.clear()
+        box = pc.box_from_parameters(REFERENCE_CONFIGS[config])
+        return getattr(box, part)()
+    return run
+
+
+def _path_benchmark(n):
+    edges = synthetic_path_edges(n)
+    return lambda: pc.order_edges(edges)
+
+
+def _sketch_path_benchmark(config):
+    sketch = pc.box_from_parameters(REFERENCE_CONFIGS[config])._top_sketch()
+    return lambda: pc.shape_to_ordered_path(sketch)
+
+
+def _fillet_sweep_benchmark(config):
+    box = pc.box_from_parameters(REFERENCE_CONFIGS[config])
+    sketch = box._top_sketch()
+    def run():
+        pc.FILLET_ENGINE.clear()
+        return pc.FILLET_ENGINE.solid(1, 1, box.dim_wall.X, box.dim_top.Z, sketch, box.clearance.X,
+                                      pc.fillet_position(box, 1, 1))[0]
+    return run
+
+
+def benchmarks():
+    """
+    All benchmarks of the suite.
+
+    Returns:
+    dict: benchmark name -> setup function returning the callable to time.
+    """
+    suite = {}
+    for config, parameters in REFERENCE_CONFIGS.items():
+        for part in getattr(pc, parameters["class"]).part_names:
+            suite[f"{config}/{part}"] = lambda config=config, part=part: _part_benchmark(config, part)
+    for n in (1000, 5000):
+        suite[f"order_edges/{n}_edges"] = lambda n=n: _path_benchmark(n)
+    suite["shape_to_ordered_path/gm328a_case_top"] = lambda: _sketch_path_benchmark("gm328a_case")
+    suite["fillet_sweep/gm328a_case_top"] = lambda: _fillet_sweep_benchmark("gm328a_case")
+    return suite
+
+
+# import of the model module (on top of build123d) and of the VSCode script:
+# each one runs in a fresh interpreter, it must not build geometry or load the viewer
+IMPORT_BENCHMARKS = {"import/parametric_case": "parametric_case.py",
+                     "import/vscode_script": "GM328A Case - VSCode + OCP.py"}
+_IMPORT_PROBE = """
+import importlib.util, json, resource, sys, time
+import build123d
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("probe", sys.argv[1])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(json.dumps({"time": time.perf_counter() - start, "viewer": "ocp_vscode" in sys.modules,
+                  "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def _run_import_benchmark(name, repeat):
+    # best of several fresh interpreters; parametric_case is imported once by both probes
+    directory = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE, os.path.join(directory, IMPORT_BENCHMARKS[name])],
+                                capture_output=True, text=True, check=True, cwd=directory).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    best = min(runs, key=lambda run: run["time"])
+    return {"time": best["time"], "peak_rss_kb": best["peak_rss_kb"], "rss_growth_kb": 0,
+            "faces": 0, "edges": 0, "viewer_imported": any(run["viewer"] for run in runs)}
+
+
+def check_imports(results, budget):
+    """
+    Returns:
+    list: messages for the import benchmarks over budget or loading the viewer.
+    """
+    failures = []
+    for name in IMPORT_BENCHMARKS:
+        if name not in results:
+            continue
+        if results[name]["time"] > budget:
+            failures.append(f"IMPORT BUDGET {name}: {results[name]['time']:.3f}s > {budget:.3f}s")
+        if results[name]["viewer_imported"]:
+            failures.append(f"IMPORT {name}: ocp_vscode imported")
+    return failures
+
+
+def _peak_rss_kb():
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_benchmark(name, repeat):
+    # runs in a fresh worker process
+    run = benchmarks()[name]()
+    rss_start = _peak_rss_kb()
+    seconds, result = _best_of(run, repeat)
+    if isinstance(result, bd.Shape):
+        faces, edges = len(result.faces()), len(result.edges())
+    else:
+        faces, edges = 0, len(result)
+    return {"time": seconds, "peak_rss_kb": _peak_rss_kb(), "rss_growth_kb": _peak_rss_kb() - rss_start,
+            "faces": faces, "edges": edges}
+
+
+def run_suite(names=None, repeat=3):
+    """
+    Run benchmarks, each one in its own (fresh) process, one at a time.
+
+    Returns:
+    dict: benchmark name -> {time, peak_rss_kb, rss_growth_kb, faces, edges}.
+    """
+    os.environ["PARAMETRIC_CASE_CACHE_DISABLE"] = "1"   # always measure real builds
+    names = names or list(benchmarks()) + list(IMPORT_BENCHMARKS)
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for name in names:
+            if name in IMPORT_BENCHMARKS:
+                results[name] = _run_import_benchmark(name, repeat)
+            else:
+                results[name] = pool.submit(_run_benchmark, name, repeat).result()
+    return results
+
+
+#*******************
+# HISTORY
+#*******************
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path, results):
+    record = {"date": datetime.datetime.now().isoformat(timespec="seconds"),
+              "commit": _git_commit(), "results": results}
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+def find_regressions(results, history, threshold=0.2, window=5, min_delta=0.005):
+    """
+    Compare the results with the median time of the last runs in the history.
+
+    Changes under min_delta seconds are timer noise on the millisecond
+    benchmarks (import times are budgeted by check_imports).
+
+    Returns:
+    list: (name, time, reference time) for benchmarks slower than
+    reference * (1 + threshold) and than reference + min_delta.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = [r["results"][name]["time"] for r in history[-window:] if name in r["results"]]
+        if previous:
+            reference = statistics.median(previous)
+            if result["time"] > max(reference * (1 + threshold), reference + min_delta):
+                regressions.append((name, result["time"], reference))
+    return regressions
+
+
+#*******************
+# STRATEGY COMPARISONS
+#*******************
+def bench_top_cutouts(repeat=3):
+    """
+    Compare the GM328A lid cutouts done one boolean per tool against a single
+    multi-tool boolean (cut_tools).
+
+    Returns:
+    dict: wall times (s) and the resulting volumes of both strategies.
+    """
+    box = gm328a_case_reference()
+    lid = pc.parametric_box.top_solid(box) + box._internal_flange_solid()
+    tools = box._top_cutouts()
+
+    def sequential():
+        solid = lid
+        for tool in tools:
+            solid -= tool
+        return solid
+
+    t_sequential, s_sequential = _best_of(sequential, repeat)
+    t_single, s_single = _best_of(lambda: pc.cut_tools(lid, tools), repeat)
+    return {"tools": len(tools),
+            "sequential": t_sequential, "single": t_single,
+            "volume_sequential": s_sequential.volume, "volume_single": s_single.volume}
+
+
+def bench_transport(repeat=5):
+    """
+    Compare the worker -> parent round trip of a few parts: text BREP pickled
+    through the result pipe against binary BREP in shared memory.
+
+    Returns:
+    list: one dict per part with the payload sizes and round trip times.
+    """
+    box = gm328a_case_reference()
+    solids = {"connector hole": pc.connector().hole_empty(), "magneto hole": pc.magneto().hole_empty(),
+              "top_fillet_solid": box.top_fillet_solid(), "wall_solid": box.wall_solid()}
+    results = []
+    for name, solid in solids.items():
+        text = pickle.dumps(pc.shape_to_brep(solid))
+        t_text, _ = _best_of(lambda: pc.brep_to_part(pickle.loads(pickle.dumps(pc.shape_to_brep(solid)))), repeat)
+        t_shared, _ = _best_of(lambda: pp.receive_part(pickle.loads(pickle.dumps(pp.share_part(solid))))[0], repeat)
+        results.append({"part": name, "text_bytes": len(text), "binary_bytes": len(pp.shape_to_binary(solid)),
+                        "text": t_text, "shared": t_shared})
+    return results
+
+
+def bench_threads(threads=(1, 2, 4), boxes=4):
+    """
+    Scaling of concurrent builds driven from threads: every part of a few 60x40
+    box variants, built by thread pools of increasing size in this process.
+    Builds only run in parallel on free-threaded Python (python3.13t and later);
+    with the GIL, the timings show the cost of the locking.
+
+    Returns:
+    dict: gil (enabled or not), and per thread count the wall time, the speedup
+    over one thread and whether the volumes match the one thread build.
+    """
+    variants = [pc.box_from_parameters(dict(REFERENCE_CONFIGS["box_60x40"], flange_height_top=3 + i/2)).parameters()
+                for i in range(boxes)]
+    results = {"gil": getattr(sys, "_is_gil_enabled", lambda: True)(), "threads": {}}
+    reference = None
+    for n in threads:
+        pc.FILLET_ENGINE.clear()
+        built = [pc.parametric_box(parameters) for parameters in variants]
+        jobs = [(box, part) for box in built for part in box.part_names]
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n) as pool:
+            volumes = list(pool.map(lambda job: round(getattr(job[0], job[1])().volume, 3), jobs))
+        elapsed = time.perf_counter() - start
+        reference = reference or (elapsed, volumes)
+        results["threads"][n] = {"time": elapsed, "speedup": reference[0] / elapsed, "same": volumes == reference[1]}
+    return results
+
+
+def synthetic_path_edges(n, seed=0):
+    """
+    Closed polygon with n line edges, shuffled and with about half of the edges
+    reversed (worst case for edge chaining).
+    """
+    pts = [bd.Vector(50*math.cos(2*math.pi*i/n), 50*math.sin(2*math.pi*i/n), 0) for i in range(n)]
+    edges = [bd.Edge.make_line(pts[i], pts[(i+1) % n]) for i in range(n)]
+    rnd = random.Random(seed)
+    first, others = edges[0], edges[1:]
+    rnd.shuffle(others)
+    others = [edge.reversed() if rnd.random() < 0.5 else edge for edge in others]
+    return [first] + others
+
+
+def _legacy_order_edges(edges):
+    # original shape_to_ordered_path chaining: nested scan with exact point comparison
+    edges = list(edges)
+    ordered_edges = [edges.pop(0)]
+    while edges:
+        last_point = ordered_edges[-1].end_point()
+        for i, edge in enumerate(edges):
+            if edge.start_point() == last_point:
+                ordered_edges.append(edges.pop(i))
+                break
+            elif edge.end_point() == last_point:
+                ordered_edges.append(edges.pop(i).reversed())
+                break
+    return ordered_edges
+
+
+def bench_ordered_path(sizes=(100, 400, 1000, 5000), legacy_max=400):
+    """
+    Time order_edges on synthetic paths of growing size (and the legacy nested
+    scan for the smaller ones).
+
+    Returns:
+    list: one dict per size with the wall times (legacy is None when skipped).
+    """
+    results = []
+    for n in sizes:
+        edges = synthetic_path_edges(n)
+        start = time.perf_counter()
+        ordered = pc.order_edges(edges)
+        t_indexed = time.perf_counter() - start
+        assert len(ordered) == n
+        t_legacy = None
+        if n <= legacy_max:
+            start = time.perf_counter()
+            _legacy_order_edges(edges)
+            t_legacy = time.perf_counter() - start
+        results.append({"edges": n, "indexed": t_indexed, "legacy": t_legacy})
+    return results
+
+
+def compare():
+    pc.PART_CACHE.enabled = False
+    r = bench_top_cutouts()
+    print(f"lid cutouts ({r['tools']} tools): sequential {r['sequential']:.3f}s, "
+          f"single boolean {r['single']:.3f}s ({r['sequential']/r['single']:.1f}x), "
+          f"volume {r['volume_sequential']:.3f} / {r['volume_single']:.3f}")
+    for r in bench_transport():
+        print(f"transport {r['part']}: text BREP {r['text']*1000:.1f}ms ({r['text_bytes']/1024:.0f} KB), "
+              f"shared binary {r['shared']*1000:.1f}ms ({r['binary_bytes']/1024:.0f} KB)")
+    r = bench_threads()
+    for n, t in r["threads"].items():
+        print(f"threads ({'GIL' if r['gil'] else 'free-threaded'}) {n}: {t['time']:.3f}s, "
+              f"{t['speedup']:.2f}x, {'same volumes' if t['same'] else 'VOLUMES DIFFER'}")
+    for r in bench_ordered_path():
+        legacy = "skipped" if r["legacy"] is None else f"{r['legacy']:.3f}s"
+        print(f"ordered path ({r['edges']} edges): indexed {r['indexed']:.3f}s, legacy {legacy}")
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parametric box part builds.")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best one is kept")
+    parser.add_argument("--history", default="bench_history.jsonl", help="history file")
+    parser.add_argument("--no-history", action="store_true", help="do not append the results to the history")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold (0.2 = 20%% slower)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="slowdowns under this many seconds are not regressions")
+    parser.add_argument("--compare", action="store_true", help="run the strategy comparisons instead of the suite")
+    parser.add_argument("--import-budget", type=float, default=0.25,
+                        help="max import time of the model module and scripts, on top of build123d (seconds)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare()
+        return 0
+
+    names = [name for name in list(benchmarks()) + list(IMPORT_BENCHMARKS) if not args.filter or args.filter in name]
+    results = run_suite(names, args.repeat)
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, args.threshold, min_delta=args.min_delta)
+    import_failures = check_imports(results, args.import_budget)
+
+    print(f"{'benchmark':<46}{'time (s)':>10}{'peak RSS (MB)':>15}{'faces':>8}{'edges':>8}")
+    for name, r in results.items():
+        print(f"{name:<46}{r['time']:>10.3f}{r['peak_rss_kb']/1024:>15.1f}{r['faces']:>8}{r['edges']:>8}")
+    for name, seconds, reference in regressions:
+        print(f"REGRESSION {name}: {seconds:.3f}s vs {reference:.3f}s (+{100*(seconds/reference-1):.0f}%)")
+    for message in import_failures:
+        print(message)
+    if not args.no_history:
+        append_history(args.history, results)
+    return 1 if regressions or import_failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
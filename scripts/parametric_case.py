@@ -0,0 +1,2017 @@
+# GM328A Case - parametric box model (importable, no viewer dependency)
+#
+# Geometry of the boxes and their part cache. Building in worker processes is
+# in parametric_parallel.py, profiling and tracing in parametric_profiling.py
+# and the vectorized feasibility checks in parametric_feasibility.py.
+import build123d as bd
+import math as math
+import collections.abc
+import contextlib
+import contextvars
+import copyreg
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import threading
+from OCP.BRep import BRep_Builder
+from OCP.BRepTools import BRepTools
+from OCP.TopoDS import TopoDS_Shape
+
+#*******************
+# SUPPORT FUNCTIONS 
+#*******************
+def _point_key(point, tolerance):
+    # quantize a point into a grid cell of size tolerance
+    return (round(point.X/tolerance), round(point.Y/tolerance), round(point.Z/tolerance))
+
+
+def order_edges(edges, tolerance=1e-6):
+    """
+    Chain edges end to start, reversing the ones that point the wrong way.
+
+    Edge endpoints are indexed in a dictionary by quantized coordinates, so each
+    edge is found in constant time (the whole chain is O(n)). Two points match
+    when they are closer than tolerance; the neighbour cells are also searched so
+    points that round to different cells still match. The chain grows from
+    edges[0] in both directions, so an open path may be given in any order.
+
+    Parameters:
+    edges (list): the edges to be ordered; a closed path starts at edges[0].
+    tolerance (float): max distance between the end of an edge and the start of the next.
+
+    Returns:
+    list: the ordered (and, when needed, reversed) edges.
+
+    Raises:
+    ValueError: when the edges do not form a single chain (gap, or branch: more
+    than two edge ends at one point).
+    """
+    edges = list(edges)
+    if not edges:
+        return []
+
+    # index both endpoints of every edge
+    points = [(edge.start_point(), edge.end_point()) for edge in edges]
+    index = {}
+    for i in range(len(edges)):
+        for end in (0, 1):
+            index.setdefault(_point_key(points[i][end], tolerance), []).append((i, end))
+    neighbours = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    used = [False] * len(edges)
+    used[0] = True
+
+    def next_edge(point):
+        # the unused edge end at point, None at the end of an open path
+        kx, ky, kz = _point_key(point, tolerance)
+        matches = [(i, end) for dx, dy, dz in neighbours for i, end in index.get((kx+dx, ky+dy, kz+dz), ())
+                   if (points[i][end] - point).length <= tolerance]
+        if len(matches) > 2:
+            raise ValueError(f"Edges do not form a continuous path: branch at {point}, "
+                             f"{len(matches)} edge ends meet there")
+        return next(((i, end) for i, end in matches if not used[i]), None)
+
+    # forward from the end of the first edge
+    ordered_edges = [edges[0]]
+    last_point = points[0][1]
+    while (match := next_edge(last_point)) is not None:
+        i, end = match
+        used[i] = True
+        if end == 0:
+            ordered_edges.append(edges[i])
+            last_point = points[i][1]
+        else:
+            # the next edge is reversed, reverse its direction
+            ordered_edges.append(edges[i].reversed())
+            last_point = points[i][0]
+
+    # then backward from its start (open paths seeded mid-chain)
+    previous_edges = []
+    first_point = points[0][0]
+    while (match := next_edge(first_point)) is not None:
+        i, end = match
+        used[i] = True
+        if end == 1:
+            previous_edges.append(edges[i])
+            first_point = points[i][0]
+        else:
+            previous_edges.append(edges[i].reversed())
+            first_point = points[i][1]
+
+    if not all(used):
+        raise ValueError(f"Edges do not form a continuous path: gap at {first_point} or {last_point}, "
+                         f"{used.count(False)} of {len(edges)} edges could not be chained")
+    return previous_edges[::-1] + ordered_edges
+
+
+# Function to create a polyline from a shape
+def shape_to_ordered_path(shape, tolerance=1e-6):
+    """
+    Convert a Shape into a Polyline (for sweep purposes, for example).
+
+    Parameters:
+    shape (Shape): the Shape object to be converted.
+    tolerance (float): max gap between consecutive edges (see order_edges).
+
+    Returns:
+    Curve: a Curve create from the edges of the input Shape.
+    """        
+    ordered_edges = order_edges(shape.edges(), tolerance)
+    curve = bd.Curve() + ordered_edges
+    return curve
+
+
+def cut_tools(solid, tools):
+    """
+    Subtract several tool solids from a solid with a single boolean operation.
+
+    Chaining "solid -= tool" runs one boolean per tool, each on an increasingly
+    complex solid. Passing all tools at once runs one BOP with many arguments.
+
+    Parameters:
+    solid (Part): the solid to be cut.
+    tools (list): the tool solids to subtract (None entries are ignored).
+
+    Returns:
+    Part: the solid without the tools.
+    """
+    tools = [tool for tool in tools if tool is not None]
+    if not tools:
+        return solid
+    return solid - tools
+
+
+#*******************
+# PART CACHE
+#*******************
+class part_cache():
+    """
+    Persistent, content-addressed cache of part solids stored as BREP files.
+
+    Each entry is a file named after the digest of its key. Reading an entry
+    refreshes its modification time, so the oldest files are the least recently
+    used ones and are evicted first when the cache grows beyond max_size.
+    """
+    def __init__(self, directory, max_size=512*1024*1024, enabled=True):
+        # instance properties
+        self.directory = directory
+        self.max_size = max_size                    # bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()               # counters, shared by the build threads
+        return None
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".brep")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.isfile(path):
+            self._count(False)
+            return None
+        try:
+            shape = bd.import_brep(path)
+            os.utime(path)                          # mark as recently used
+        except FileNotFoundError:                   # evicted by a concurrent build
+            self._count(False)
+            return None
+        except Exception:
+            # corrupted/partial entry: drop it and rebuild
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._count(False)
+            return None
+        self._count(True)
+        return bd.Part(shape.wrapped)
+
+    def put(self, key, shape):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        bd.export_brep(shape, tmp_path)
+        os.replace(tmp_path, path)                  # atomic, readers never see partial files
+        self.evict()
+        return None
+
+    def evict(self):
+        if not os.path.isdir(self.directory):
+            return None
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".brep"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:           # evicted by a concurrent build
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        # drop least recently used entries until the cache fits
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        return None
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".brep"):
+                    os.remove(os.path.join(self.directory, name))
+        return None
+
+
+def _cache_canonical(value):
+    """
+    Convert a parameter value into a JSON serializable, hash stable structure.
+
+    Floats are rounded so that values differing only by float noise map to the
+    same key. Component objects (board, zif, ...) are expanded by their public
+    attributes; private attributes (leading underscore) hold runtime state and
+    are ignored.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, bd.Vector):
+        return ["Vector", round(value.X, 9), round(value.Y, 9), round(value.Z, 9)]
+    if isinstance(value, (list, tuple)):
+        return [_cache_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _cache_canonical(v) for k, v in sorted(value.items()) if not str(k).startswith("_")}
+    if hasattr(value, "__dict__"):
+        return [type(value).__name__, _cache_canonical(vars(value))]
+    return repr(value)
+
+
+def _cache_code_version():
+    # any change to this file invalidates all cached parts
+    try:
+        with open(__file__, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (NameError, OSError):
+        return CACHE_VERSION
+
+
+CACHE_VERSION = "1"
+PART_CACHE = part_cache(directory=os.environ.get("PARAMETRIC_CASE_CACHE",
+                                                 os.path.join(os.path.expanduser("~"), ".cache", "parametric_case")),
+                        max_size=int(os.environ.get("PARAMETRIC_CASE_CACHE_SIZE", 512*1024*1024)),
+                        enabled=os.environ.get("PARAMETRIC_CASE_CACHE_DISABLE", "") == "")
+_CACHE_CODE_VERSION = _cache_code_version()
+# part cache bypassed in this context (thread): inside a cached part, or profiling
+_PART_CACHE_BYPASS = contextvars.ContextVar("part_cache_bypass", default=False)
+# callbacks(cache, hit, key) told of the cache hits and misses of this context (see parametric_profiling.build_trace)
+CACHE_EVENTS = contextvars.ContextVar("cache_events", default=())
+
+
+def _trace_cache(cache, hit, key):
+    # cache hit/miss event: part cache, feature memo, fillet engine
+    for callback in CACHE_EVENTS.get():
+        callback(cache, hit, key)
+    return None
+
+
+@contextlib.contextmanager
+def part_cache_bypass():
+    """
+    Build without PART_CACHE in this context (thread), e.g. to profile the
+    geometry operations that a cached part would hide.
+    """
+    token = _PART_CACHE_BYPASS.set(True)
+    try:
+        yield
+    finally:
+        _PART_CACHE_BYPASS.reset(token)
+
+
+def cached_part(method):
+    """
+    Decorator to store/retrieve the result of a part method in PART_CACHE.
+
+    The key is a digest of the class, the method, the code version and the
+    instance parameters. Only the outermost part call of a thread is cached,
+    so a subclass calling parametric_box.top_solid(self) does not store a
+    second entry.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not PART_CACHE.enabled or _PART_CACHE_BYPASS.get():
+            return method(self, *args, **kwargs)
+
+        key_data = [CACHE_VERSION, _CACHE_CODE_VERSION,
+                    type(self).__module__, type(self).__qualname__, method.__qualname__,
+                    _cache_canonical(vars(self)), _cache_canonical(args), _cache_canonical(kwargs)]
+        key = hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+        solid = PART_CACHE.get(key)
+        _trace_cache("part cache", solid is not None, method.__qualname__)
+        if solid is not None:
+            return solid
+
+        token = _PART_CACHE_BYPASS.set(True)
+        try:
+            solid = method(self, *args, **kwargs)
+        finally:
+            _PART_CACHE_BYPASS.reset(token)
+        PART_CACHE.put(key, solid)
+        return solid
+    return wrapper
+
+
+#*******************
+# FEATURES
+#*******************
+def feature(reads=(), depends=()):
+    """
+    Decorator declaring a method as a named feature of the box dependency graph.
+
+    Parameters:
+    reads (tuple): parameters (instance attributes) read by the method itself.
+    depends (tuple): features used by the method, as method names resolved on
+                     the box class (virtual, e.g. "_top_sketch") or as
+                     "class.method" for an explicit base class call.
+
+    Results are memoized per instance and arguments, together with a
+    fingerprint of the parameters read by the feature and by everything it
+    depends on. Editing a parameter (reassigned or mutated in place, e.g.
+    box.dim_top.X = 80) only invalidates the features that read it, directly or
+    through a dependency; the others are reused. Returned shapes are shared, so
+    callers must not mutate them in place (build123d operators return new
+    objects).
+
+    Several threads may build parts of the same box: each feature is computed
+    once, under a per-feature lock (features only call their dependencies, so
+    the locks are always taken in graph order). Parameters must not be edited
+    while a build is running.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+            fingerprint = _feature_fingerprint(self, wrapper)
+            memo = self.__dict__.setdefault("_features", {})
+            entry = memo.get(key)
+            hit = entry is not None and entry[0] == fingerprint
+            if not hit:
+                locks = self.__dict__.setdefault("_feature_locks", {})
+                with locks.get(key) or locks.setdefault(key, threading.RLock()):
+                    entry = memo.get(key)           # built by another thread meanwhile
+                    if entry is None or entry[0] != fingerprint:
+                        entry = memo[key] = (fingerprint, method(self, *args, **kwargs))
+            _trace_cache("feature memo", hit, method.__qualname__)
+            return entry[1]
+        wrapper.reads = tuple(reads)
+        wrapper.depends = tuple(depends)
+        return wrapper
+    return decorator
+
+
+def _resolve_feature(cls, name):
+    # "method" is looked up on the box class, "class.method" in this module
+    owner, _, attribute = name.rpartition(".")
+    method = getattr(globals()[owner] if owner else cls, attribute, None)
+    if not hasattr(method, "depends"):
+        raise ValueError(f"{name} is not a feature of {cls.__name__}")
+    return method
+
+
+@functools.cache
+def _feature_reads(cls, method):
+    # parameters read by a feature and by all its dependencies
+    reads = set(method.reads)
+    for name in method.depends:
+        reads |= _feature_reads(cls, _resolve_feature(cls, name))
+    return frozenset(reads)
+
+
+def _feature_fingerprint(box, method):
+    reads = sorted(_feature_reads(type(box), method))
+    return json.dumps(_cache_canonical([getattr(box, name, None) for name in reads]))
+
+
+def feature_graph(cls):
+    """
+    Dependency graph of the features of a box class.
+
+    Returns:
+    dict: feature name -> {"reads": parameters read directly, "depends":
+    features used, "all_reads": parameters read directly or through the
+    dependencies}.
+    """
+    graph = {}
+    for name in dir(cls):
+        method = getattr(cls, name)
+        if hasattr(method, "depends"):
+            graph[name] = {"reads": sorted(method.reads), "depends": list(method.depends),
+                           "all_reads": sorted(_feature_reads(cls, method))}
+    return graph
+
+
+def affected_features(cls, parameter):
+    """
+    Features of a box class invalidated by a change of one parameter.
+    """
+    return sorted(name for name, node in feature_graph(cls).items() if parameter in node["all_reads"])
+
+
+class lazy_parts(collections.abc.Mapping):
+    """
+    Read-only mapping of the parts of a box (box.parts()), part name -> Part.
+
+    Nothing is built until a part is accessed (or exported); parts are box
+    features, so they are memoized and rebuilt only after a change of the
+    parameters they depend on.
+
+        parts = box.parts()
+        parts.export("top_solid", "GM328A_Case_Lid.stl")    # builds the lid only
+    """
+    def __init__(self, box):
+        # instance properties
+        self.box = box
+        return None
+
+    def __getitem__(self, part):
+        if part not in self.box.part_names:
+            raise KeyError(part)
+        return getattr(self.box, part)()
+
+    def __iter__(self):
+        return iter(self.box.part_names)
+
+    def __len__(self):
+        return len(self.box.part_names)
+
+    def export(self, part, path):
+        """
+        Build (if needed) and export a part, see export_part.
+        """
+        export_part(self[part], path)
+        return None
+
+
+#*******************
+# FILLET ENGINE
+#*******************
+# fillet profiles for a unit shell: (x * shell width, z * shell height)
+FILLET_PROFILES = [
+    [   # 0 - fillet snapped
+    (+0.000, +1.000),
+    (+0.000, +0.750),
+    (-0.750, +0.000),
+    (-1.000, +0.000), 
+    (-1.000, +0.375),
+    (-1.125, +0.500),
+    (-1.000, +0.625),
+    (-1.000, +1.000),
+    (+0.000, +1.000)
+    ], [   # 1 - lid/base locks the fillet in place
+    (+0.500, -0.500),
+    (+0.500, +0.000),
+    (+0.000, +0.000),
+    (+0.000, +0.500), 
+    (-0.250, +0.500),
+    (-1.000, -0.250),
+    (-1.000, -0.500),
+    (-0.500, -0.500),
+    (-0.375, -0.375),
+    (-0.250, -0.500),
+    (+0.500, -0.500)
+    ]]
+
+# profile rotation, indexed by [side][fillet type] (side: 0 = bottom, 1 = top)
+FILLET_ROTATIONS = [[[90, 0, 180], [90, 180, 180]],
+                    [[90, 0,   0], [90, 10,   0]]]
+
+
+def fillet_profile_points(fillet_type, shell_xy, shell_z):
+    """
+    Points of the fillet profile polyline scaled to the shell dimensions.
+    """
+    return [(shell_xy*x, shell_z*z) for x, z in FILLET_PROFILES[fillet_type]]
+
+
+def fillet_position(box, side, fillet_type):
+    """
+    Z offset of the fillet profile for a box, indexed like FILLET_ROTATIONS.
+    """
+    return bd.Vector([[[0, 0, 0], [0, 0, box.dim_bottom.Z/2]],
+                      [[0, 0, box.height], [0, 0, box.height-box.dim_top.Z/2]]][side][fillet_type])
+
+
+def _shape_digest(shape):
+    # geometry hash: same construction gives the same BREP text
+    return hashlib.sha256(shape_to_brep(shape)).hexdigest()
+
+
+class fillet_engine():
+    """
+    Shared fillet sweep for parametric_box and parametric_fillet.
+
+    Keeps three caches, shared by every box in the process:
+    - profile faces per (fillet type, shell_xy, shell_z), built at the origin;
+    - ordered sweep paths per (sketch digest, clearance);
+    - swept solids per (profile, path, side, position).
+    Cached shapes are shared: callers must not modify them in place. Lookups
+    and stores are locked, the shapes are built outside the lock (two threads
+    may build the same entry, the last one is kept).
+    """
+    def __init__(self, max_entries=256):
+        # instance properties
+        self.max_entries = max_entries
+        self.profiles = {}
+        self.paths = {}
+        self.sweeps = {}
+        self._lock = threading.Lock()
+        return None
+
+    def clear(self):
+        with self._lock:
+            self.profiles.clear()
+            self.paths.clear()
+            self.sweeps.clear()
+        return None
+
+    def _lookup(self, cache, key):
+        with self._lock:
+            return cache.get(key)
+
+    def _store(self, cache, key, value):
+        with self._lock:
+            # drop the oldest entries (dicts keep insertion order)
+            while len(cache) >= self.max_entries:
+                del cache[next(iter(cache))]
+            cache[key] = value
+        return value
+
+    def profile(self, fillet_type, shell_xy, shell_z):
+        key = (fillet_type, round(shell_xy, 9), round(shell_z, 9))
+        profile = self._lookup(self.profiles, key)
+        if profile is None:
+            polyline = bd.Polyline(fillet_profile_points(fillet_type, shell_xy, shell_z))
+            profile = self._store(self.profiles, key, bd.Face.make_surface(polyline))
+        return profile
+
+    def path(self, sketch, clearance):
+        """
+        Ordered sweep path around a sketch, offset by clearance.
+
+        Returns:
+        tuple: (path key, Curve).
+        """
+        key = (_shape_digest(sketch), round(clearance, 9))
+        path = self._lookup(self.paths, key)
+        _trace_cache("fillet path", path is not None, key[0][:12])
+        if path is None:
+            # adjust for clearance
+            if (clearance != 0):
+                sketch = bd.offset(sketch, amount=clearance)
+            path = self._store(self.paths, key, shape_to_ordered_path(sketch))
+        return key, path
+
+    def solid(self, fillet_type, side, shell_xy, shell_z, sketch, clearance, pos):
+        """
+        Sweep a fillet profile around a (top or bottom) sketch.
+
+        Parameters:
+        fillet_type (int): profile index in FILLET_PROFILES.
+        side (int): 0 = bottom, 1 = top.
+        shell_xy, shell_z (float): shell dimensions used to scale the profile.
+        sketch (Sketch): top/bottom sketch defining the path.
+        clearance (float): offset applied to the sketch.
+        pos (bd.Vector): position of the profile (see fillet_position).
+
+        Returns:
+        tuple: (Part, Face) - the swept fillet and the positioned profile section.
+        """
+        path_key, _path = self.path(sketch, clearance)
+        key = (fillet_type, side, round(shell_xy, 9), round(shell_z, 9), path_key, tuple(_cache_canonical(pos)))
+        swept = self._lookup(self.sweeps, key)
+        _trace_cache("fillet sweep", swept is not None, (fillet_type, side))
+        if swept is None:
+            # correct position and rotation
+            rot = bd.Vector(FILLET_ROTATIONS[side][fillet_type])
+            section = bd.Pos(pos) * bd.Pos(_path.edges()[0] @ 0) * bd.Rot(rot) * \
+                      self.profile(fillet_type, shell_xy, shell_z)
+            # create fillet
+            solid = bd.sweep([section], _path, transition=bd.Transition.RIGHT)
+            swept = self._store(self.sweeps, key, (solid, section))
+        return swept
+
+
+FILLET_ENGINE = fillet_engine()
+
+
+#*******************
+# CLASSES 
+#*******************
+def _own_vectors(component):
+    # instance copies of the class level dimensions: editing the board of one
+    # box (e.g. case.board.d.X = 80) does not change the other boxes
+    for name, value in vars(type(component)).items():
+        if isinstance(value, bd.Vector):
+            setattr(component, name, bd.Vector(value))
+    return None
+
+
+class board():
+    # class properties
+    d = bd.Vector(78.7, 63.8, 1.52)          # PCB dimensions
+    solder = 4.0 #3.48                       # height of the solder leads (bottom of the PCB)
+    hole_radius = 1.55
+    hole_pos = hole_radius + 1.3
+    dxy = bd.Vector(-78.7/2+hole_pos, -63.8/2+hole_pos, 1.52/2)
+    dXy = bd.Vector(+78.7/2-hole_pos, -63.8/2+hole_pos, 1.52/2)
+    dxY = bd.Vector(-78.7/2+hole_pos, +63.8/2-hole_pos, 1.52/2)
+    dXY = bd.Vector(+78.7/2-hole_pos, +63.8/2-hole_pos, 1.52/2)
+
+    def __init__(self):
+        # instance properties
+        _own_vectors(self)
+        return None
+
+    def solid(self):
+        solid = bd.Box(self.d.X, self.d.Y, self.d.Z)
+
+        # fillets
+        z_edges = solid.edges().filter_by(bd.Axis.Z)
+        solid = bd.fillet(z_edges, radius=2.35)
+
+        # holes       
+        solid -= bd.Pos(self.dxy) * bd.Hole(radius=self.hole_radius, depth=self.d.Z)
+        solid -= bd.Pos(self.dXy) * bd.Hole(radius=self.hole_radius, depth=self.d.Z)
+        solid -= bd.Pos(self.dxY) * bd.Hole(radius=self.hole_radius, depth=self.d.Z)
+        solid -= bd.Pos(self.dXY) * bd.Hole(radius=self.hole_radius, depth=self.d.Z)
+
+        return solid
+
+class lcd():
+    # class properties
+    d = bd.Vector(34.0 + 2.20, 43.8 + 2.33, 4.0)
+
+    def __init__(self, pos, clearance):
+        # instance properties
+        _own_vectors(self)
+        self.p = pos
+        self.clearance = clearance
+        return None
+    
+    def sketch(self):
+        slcd = bd.Pos(self.p + bd.Vector(self.d.X/2, self.d.Y/2, 0)) * bd.Rectangle(self.d.X + self.clearance.X, self.d.Y + self.clearance.Y)
+        return slcd
+    
+    def solid_hole_upwards(self):
+        slcd = self.sketch()
+        solid_hole = bd.extrude(slcd, amount=20) 
+        return solid_hole
+    
+    def solid_screws(self, box):
+        solid = bd.Pos(-box.board.d.X/2+11, -box.board.d.Y/2+5, box.height - box.dim_top.Z - 1.5/2 + 1) * bd.Cylinder(radius=2.9, height=1.5)
+        solid += bd.Pos(-box.board.d.X/2+38, -box.board.d.Y/2+5, box.height - box.dim_top.Z - 1.5/2 + 1) * bd.Cylinder(radius=2.9, height=1.5)
+        return solid
+    
+class encoder():
+    # class properties
+    d = bd.Vector(13.8, 11.9, 0)
+    radius = 10/2
+
+    def __init__(self, pos):
+        # instance properties
+        _own_vectors(self)
+        self.p = pos
+        return None
+    
+    def sketch(self):
+        senc = bd.Pos(self.p + bd.Vector(-self.d.X/2, self.d.Y/2, 0)) * bd.Circle(self.radius)
+        return senc
+    
+    def solid_hole_upwards(self):
+        senc = self.sketch()
+        solid_hole = bd.extrude(senc, amount=20) 
+        return solid_hole
+
+class led():
+    # class properties
+    radius = 3/2
+
+    def __init__(self, pos):
+        # instance properties
+        self.p = pos
+        return None
+    
+    def sketch(self):
+        sled = bd.Pos(self.p + bd.Vector( self.radius, self.radius, 0)) * bd.Circle(self.radius)
+        return sled
+
+    def solid_hole_upwards(self):
+        sled = self.sketch()
+        solid_hole = bd.extrude(sled, amount=20) 
+        return solid_hole
+
+class mkdsn():
+    # class properties  
+    d = bd.Vector(5, 10, 1000)
+    dxy = bd.Vector(10, 10, 5.2)
+    evd = bd.Vector(9.5, 11, 12.5)
+
+    def __init__(self, board, clearance_xy):
+        # instance properties
+        _own_vectors(self)
+        self.p1 = bd.Vector(board.d.X/2 - 4.55, board.d.Y/2 - self.d.Y/2 - 8.5)
+        self.p2 = bd.Vector(board.d.X/2 - 4.55, (board.d.Y+clearance_xy)/2 - self.d.Y/2 - 8.5 - self.d.Y - 6.7)
+        self.p3 = bd.Vector( -(board.d.X+clearance_xy)/2 + self.d.X/2 +0.5, (board.d.Y+clearance_xy)/2 - self.d.Y/2 - 10.2)
+        return None
+
+    def sketch(self):  
+        _slot_face =  bd.Rot(0, 0, 90) * bd.SlotOverall(self.d.Y, self.d.X, mode=bd.Mode.PRIVATE)
+        smkdsn =  bd.Pos(self.p1.X, self.p1.Y) * _slot_face
+        smkdsn += bd.Pos(self.p2.X, self.p2.Y) * _slot_face
+        smkdsn += bd.Pos(self.p3.X, self.p3.Y) * _slot_face
+        return smkdsn
+    
+    def solid_hole_outwards(self, box):
+        xy_hole =  bd.Pos(box.board.d.X/2, self.p1.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.dxy.Z/2)  * \
+                   bd.Box(self.dxy.X, self.dxy.Y, self.dxy.Z)
+        xy_hole += bd.Pos(box.board.d.X/2, self.p2.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.dxy.Z/2)  * \
+                   bd.Box(self.dxy.X, self.dxy.Y, self.dxy.Z)
+        xy_hole += bd.Pos(-box.board.d.X/2, self.p3.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.dxy.Z/2)  * \
+                   bd.Box(self.dxy.X, self.dxy.Y, self.dxy.Z)
+        return xy_hole
+
+    def solid_hole_upwards(self):
+        smkdsn = self.sketch()
+        solid_hole = bd.extrude(smkdsn, amount=2, both=True) 
+        return solid_hole
+
+    def solid_enclosed_volume(self, box):
+        xy_hole =  bd.Pos(box.board.d.X/2 - box.dim_wall.X  - 7.5/2, self.p1.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.evd.Z/2)  * \
+                   bd.Box(self.evd.X, self.evd.Y, self.evd.Z)
+        xy_hole += bd.Pos(box.board.d.X/2 - box.dim_wall.X  - 7.5/2, self.p2.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.evd.Z/2)  * \
+                   bd.Box(self.evd.X, self.evd.Y, self.evd.Z)
+        xy_hole += bd.Pos(-box.board.d.X/2 + box.dim_wall.X  + 7.5/2 + 0.25, self.p3.Y, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.evd.Z/2)  * \
+                   bd.Box(self.evd.X, self.evd.Y, self.evd.Z)
+        return xy_hole
+
+class zif():
+    # class properties
+    d1 = bd.Vector(17, 47.4, 1000)
+    d2 = bd.Vector(18, 22, 1000)
+    d3 = bd.Vector(20, 12, 1000)
+    d4 = bd.Vector(21, 27, 1000)
+
+    def __init__(self, pos, edge):
+        # instance properties
+        _own_vectors(self)
+        #self.d1 += bd.Vector(0, box.clearance_xy, 0)    ### PEB Why this in the original one?     
+        self.p = pos
+        self.edge = edge
+        return None
+    
+    def sketch(self):
+        szif =  bd.Pos(self.p.X - self.d1.X/2 + 1, (self.p.Y + self.edge) - 0.5 - (self.d1.Y+self.edge)/2) * bd.Rectangle(self.d1.X, (self.d1.Y+self.edge))
+        szif += bd.Pos(self.p.X - self.d2.X/2 + 1, (self.p.Y + self.edge) - 0.5 - self.d2.Y/2)             * bd.Rectangle(self.d2.X, self.d2.Y)
+        szif += bd.Pos(self.p.X - self.d3.X/2 + 2, (self.p.Y + self.edge) - 0.5 - self.d3.Y/2)             * bd.Rectangle(self.d3.X, self.d3.Y)
+        szif += bd.Pos(self.p.X - self.d4.X/2 + 2, (self.p.Y + self.edge) - 4.0 + (self.d4.Y-7)/2)   * bd.Rectangle(self.d4.X, self.d4.Y)              
+        return szif
+    
+    def solid_hole_outwards(self, amount = 50):
+        szif = self.sketch()
+        hole = bd.Pos(0, 0, self.p.Z) * bd.extrude(szif, amount)
+        return hole
+
+class plug():
+    d = bd.Vector(9, 15.3, 11)
+    evd = bd.Vector(12, 13.8, 12)
+    
+    def __init__(self, pos):
+        _own_vectors(self)
+        self.p = pos
+        return None
+    
+    def solid_hole_outwards(self):
+        plug_hole = bd.Pos(self.p) * bd.Box(self.d.X, 10, self.d.Z, align=[bd.Align.CENTER, bd.Align.CENTER, bd.Align.MIN])        
+        return plug_hole
+
+    def solid_hole_outwards(self):
+        plug_hole = bd.Pos(self.p) * bd.Box(self.d.X, 10, self.d.Z, align=[bd.Align.CENTER, bd.Align.CENTER, bd.Align.MIN])        
+        return plug_hole
+    
+    def solid_enclosed_volume(self, box):
+    #    solid =  bd.Pos(8.15, -box.board.d.Y/2 + box.dim_wall.Y + box.clearance.Y + 0*self.evd.Y/2, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.evd.Z/2)  * \
+    #             bd.Box(self.evd.X, self.evd.Y, self.evd.Z)  
+       solid =  bd.Pos(8.15, -box.dim_top.Y/2 + box.fillet_dim_top.Y + box.clearance.Y + box.edge_top.Y + self.evd.Y/2 + 1, box.dim_bottom.Z + box.clearance.Z + box.board.solder + box.board.d.Z + self.evd.Z/2)  * \
+                bd.Box(self.evd.X, self.evd.Y, self.evd.Z)  
+                
+       return solid
+
+class battery():
+    d = bd.Vector(26, 52, 17)
+    
+    def __init__(self):
+        _own_vectors(self)
+        return None
+    
+    def solid(self):
+        solid = bd.Box(self.d.X, self.d.Y, self.d.Z)
+        solid = bd.fillet(solid.edges(), 1)
+        return solid
+
+class connector():
+    radius = 4/2
+    length = 2.5
+    clearance = 0.2
+    length_reinf = length + 3*clearance
+    length_empty = length + clearance
+
+    def __init__(self):
+        return None
+    
+    def _sketch(self, radius):
+        sketch = bd.RegularPolygon(radius=radius, side_count=6)
+        return sketch
+    
+    def solid(self):
+        sketch = self._sketch(self.radius)
+        solid = bd.Rot(0,-90,0) * bd.extrude(sketch, self.length)
+        return solid
+    
+    def hole_reinforcement(self):
+        sketch = self._sketch(self.radius+3*self.clearance)
+        solid = bd.Rot(0, -90, 0) * bd.extrude(sketch, self.length_reinf)
+        return solid
+
+    def hole_empty(self):
+        sketch = self._sketch(self.radius+self.clearance)
+        solid = bd.Rot(0,-90,0) * bd.extrude(sketch, self.length_empty)
+        return solid
+    
+class magneto():
+    radius = 5*math.sqrt(2)/2
+    length = 2
+    clearance = 0.2
+    length_reinf = length + 3*clearance
+    length_empty = length + clearance
+
+    def __init__(self):
+        return None
+    
+    def _sketch(self, radius):
+        sketch = bd.RegularPolygon(radius=radius, side_count=4)
+        # sketch = bd.Rectangle(5,5)
+        return sketch
+    
+    def solid(self):
+        sketch = self._sketch(self.radius)
+        solid = bd.Rot(0,-90,0) * bd.extrude(sketch, self.length)
+        return solid
+    
+    def hole_reinforcement(self):
+        sketch = self._sketch(self.radius+3*self.clearance)
+        solid = bd.Rot(0, -90, 0) * bd.extrude(sketch, self.length_reinf)
+        return solid
+
+    def hole_empty(self):
+        sketch = self._sketch(self.radius+self.clearance)
+        solid = bd.Rot(0,-90,0) * bd.extrude(sketch, self.length_empty)
+
+        # cable hole
+        sketch =  bd.Pos(self.radius - 0.5/2, 0) * bd.RegularPolygon(radius=0.5, side_count=4)
+        solid += bd.Rot(0,-90,0) * bd.extrude(sketch, -3*self.length_empty)
+        solid += bd.Rot(0,-90,0) * bd.extrude(sketch,  3*self.length_empty)
+        return solid    
+
+#-----------------------------------------------------------------------------------------------------------------------
+#-----------------------------------------------------------------------------------------------------------------------
+
+class parametric_fillet():  
+    def __init__(self, fillet_type, fillet_side, box):
+        shell_xy = box.dim_wall.X
+        shell_z = box.dim_top.Z
+        self.box = box
+        self.fillet_type = fillet_type 
+        self.fillet_side = fillet_side # 0 = bottom, 1 = lid
+        self.pts_fillet_profile = fillet_profile_points(fillet_type, shell_xy, shell_z)
+        return None
+
+    def _path_sketch(self):
+        match self.fillet_side:
+            case 0: # bottom
+                _sketch = self.box._bottom_sketch()
+            case 1: # top
+                _sketch = self.box._top_sketch()
+        return _sketch
+
+    def path(self):
+        # ordered path adjusted for clearance
+        _, _path = FILLET_ENGINE.path(self._path_sketch(), self.box.clearance.X)
+        return _path 
+
+    def sketch(self):
+        # create profile
+        _sketch =  bd.Polyline(self.pts_fillet_profile)
+            
+        return _sketch
+         
+    def solid(self):
+        # swept fillet and its (positioned) section
+        special_fillet, _section = FILLET_ENGINE.solid(self.fillet_type, self.fillet_side,
+                                                       self.box.dim_wall.X, self.box.dim_top.Z,
+                                                       self._path_sketch(), self.box.clearance.X,
+                                                       fillet_position(self.box, self.fillet_side, self.fillet_type))
+        return special_fillet, [_section]
+  
+#-----------------------------------------------------------------------------------------------------------------------
+#-----------------------------------------------------------------------------------------------------------------------
+
+class box_parameters():
+    """
+    Frozen, hashable record of the parametric_box parameters.
+
+    Values are stored in canonical form: vectors as (x, y, z) tuples and floats
+    rounded to 9 decimals, so equal configurations compare, hash and digest
+    the same (e.g. flange_height_top=4 and 4.0). Records pickle as a tuple of
+    plain values, which makes them cheap keys for caches and sweep catalogs
+    and cheap to ship to worker processes.
+    """
+    __slots__ = ("dim_top", "dim_bottom", "dim_wall", "clearance", "pos_top", "pos_bottom",
+                 "base_type", "edge_top", "edge_bottom", "corners_type", "corners_size",
+                 "fillet_type_top", "fillet_dim_top", "fillet_size_top", "fillet_snap_top",
+                 "fillet_type_bottom", "fillet_dim_bottom", "fillet_size_bottom", "fillet_snap_bottom",
+                 "flange_width_top", "flange_height_top", "flange_width_bottom", "flange_height_bottom",
+                 "snap_top", "snap_bottom", "_digest")
+    # canonical form of each parameter
+    vectors  = ("dim_top", "dim_bottom", "dim_wall", "clearance", "pos_top", "pos_bottom",
+                "edge_top", "edge_bottom", "fillet_dim_top", "fillet_dim_bottom")
+    integers = ("base_type", "corners_type", "fillet_type_top", "fillet_type_bottom", "snap_top", "snap_bottom")
+    booleans = ("fillet_snap_top", "fillet_snap_bottom")
+
+    def __init__(self,
+                # box dimensions and clearances
+                dim_top,                                    # external top dimension with Z as the top shell width/height
+                dim_bottom,                                 # external bottom dimension with Z as the bottom shell width/height
+                dim_wall,                                   # x = y = wall shell width, z = height
+                clearance,                                  # reduces wall height and top/bottom external dimension                        
+                pos_top = (0,0,0),
+                pos_bottom = (0,0,0),
+                # box type
+                base_type = 1,                              # 0 = base + wall fused, 1 = dettachable base
+                edge_top = (1, 1, 1),                       # defines the edge width(x=y) and height(z) that goes on top of the fillet     
+                edge_bottom = (1, 1, 1),                    # only used for base_type = 1
+                # corner / z edges
+                corners_type = 1,                           # Corners type: 0 straight, 1 fillet, 2 chamfer
+                corners_size = 3.5,                         # Fillet radius/chamfer size for corners (z edges)
+                # fillet/chamfer definition for top and bottom
+                fillet_type_top = 4,                        # type of fillet/chamfer at top: 0 = none, 1 integrated fillet, 2 as an independent fillet part, 3 integrated chamfer, 4 as an independent chamfer part
+                fillet_dim_top = (2, 2, 2),                 # x = y = width and z = height
+                fillet_size_top = 1.5,                      # fillet radius/chamfer size
+                fillet_snap_top = False,                     # add snap between fillet and wall
+                fillet_type_bottom = 4,                     # type of fillet/chamfer at bottom: 0 = none, 1 integrated fillet, 2 as an independent fillet part, 3 integrated chamfer, 4 as an independent chamfer part
+                fillet_dim_bottom = (2, 2, 2),              # x = width, y = fillet radius/chamfer size, z = height
+                fillet_size_bottom = 1.5,                   # fillet radius/chamfer size
+                fillet_snap_bottom = False,                    # add snap between fillet and wall                
+                # flange for dettachable top/bottom
+                flange_width_top = 2,                       # applied to the lid
+                flange_height_top = 4,
+                flange_width_bottom = 2,                    # applied to the base when dettachable
+                flange_height_bottom = 4,
+                # lid/base snap     
+                snap_top = 1,                                # 0 = no lid snap, 1 lid_snap shorter side, 2 lid_snap longer side, 3 lid snap both sides
+                snap_bottom = 1                              # 0 = no base snap, 1 base_snap shorter side, 2 base_snap longer side, 3 base snap both sides
+                ):
+        """
+        Canonical parameters of a box; vectors are given as bd.Vector or (x, y, z).
+
+        Parameters:
+            dim_top: float
+                External top dimension with Z as the top shell width/height.
+            dim_bottom: float
+                External bottom dimension with Z as the bottom shell width/height.
+            dim_wall: float
+                Wall shell width (x=y) and height (z).
+            clearance: float
+                Clearance applied to reduce wall height and top/bottom external dimensions.
+            pos_top: bd.Vector, optional
+                Position vector for the top shell (default is bd.Vector(0, 0, 0)).
+            pos_bottom: bd.Vector, optional
+                Position vector for the bottom shell (default is bd.Vector(0, 0, 0)).
+            base_type: int, optional
+                Box type: 0 for base and wall fused, 1 for detachable base (default is 1).
+            edge_top: bd.Vector, optional
+                Vector defining edge width (x=y) and height (z) for the top (default is bd.Vector(1, 1, 1)).
+            edge_bottom: bd.Vector, optional
+                Vector defining edge width (x=y) and height (z) for the bottom (used only if base_type=1).
+            corners_type: int, optional
+                Corners type: 0 for straight edges, 1 for fillet, 2 for chamfer (default is 1).
+            corners_size: float, optional
+                Fillet radius or chamfer size for corners in the Z direction (default is 3.5).
+            fillet_type_top: int, optional
+                Fillet/chamfer type at the top:
+                0 = none, 1 = integrated fillet, 2 = independent fillet, 3 = integrated chamfer, 4 = independent chamfer (default is 2).
+            fillet_dim_top: bd.Vector, optional
+                Dimensions for the top fillet or chamfer (x=y for width, z for height) (default is bd.Vector(2, 2, 2)).
+            fillet_size_top: float, optional
+                Fillet radius or chamfer size at the top (default is 1.5).
+            fillet_snap_top = Boolean, optional  (default is True) 
+                Flag to add snap between top fillet and wall                
+            fillet_type_bottom: int, optional
+                Fillet/chamfer type at the bottom:
+                0 = none, 1 = integrated fillet, 2 = independent fillet, 3 = integrated chamfer, 4 = independent chamfer (default is 2).
+            fillet_dim_bottom: bd.Vector, optional
+                Dimensions for the bottom fillet or chamfer (x for width, y for radius/size, z for height) (default is bd.Vector(2, 2, 2)).
+            fillet_size_bottom: float, optional
+                Fillet radius or chamfer size at the bottom (default is 1.5).
+            fillet_snap_bottom = Boolean, optional (default is False) 
+                Flag to add snap between bottom fillet and wall                
+            flange_width_top: float, optional
+                Width of the flange applied to the top lid (default is 2).
+            flange_height_top: float, optional
+                Height of the flange applied to the top lid (default is 4).
+            flange_width_bottom: float, optional
+                Width of the flange applied to the base (default is 2).
+            flange_height_bottom: float, optional
+                Height of the flange applied to the base (default is 4).
+            snap_top = float, optional (default is 1).
+                0 = no lid snap, 1 = lid snap shorter side, 2 = lid snap longer side, 3 = lid snap both sides
+            snap_bottom: float, optional (default is 1).
+                0 = no base snap, 1 = base snap shorter side, 2 = base snap longer side, 3 = base snap both sides
+        """
+        values = locals()
+        for name in self.names():
+            value = values[name]
+            if name in self.vectors:
+                value = (value.X, value.Y, value.Z) if isinstance(value, bd.Vector) else value
+                value = tuple(round(float(v), 9) + 0.0 for v in value)
+            elif name in self.integers:
+                value = int(value)
+            elif name in self.booleans:
+                value = bool(value)
+            else:
+                value = round(float(value), 9) + 0.0
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_digest", None)
+        return None
+
+    @classmethod
+    def names(cls):
+        return cls.__slots__[:-1]
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.names())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"box_parameters is frozen, use replace({name}=...)")
+
+    def __delattr__(self, name):
+        raise AttributeError("box_parameters is frozen")
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.values() == self.values()
+
+    def __hash__(self):
+        return hash(self.values())
+
+    def __reduce__(self):
+        return (type(self), self.values())
+
+    def __repr__(self):
+        return f"box_parameters({', '.join(f'{name}={getattr(self, name)!r}' for name in self.names())})"
+
+    @property
+    def digest(self):
+        """
+        Stable sha256 hex digest of the parameters (same across processes and runs).
+        """
+        if self._digest is None:
+            object.__setattr__(self, "_digest", hashlib.sha256(json.dumps(self.values()).encode()).hexdigest())
+        return self._digest
+
+    def replace(self, **changes):
+        """
+        Returns:
+        box_parameters: a copy with some parameters changed.
+        """
+        return type(self)(**dict(self.as_dict(), **changes))
+
+    def as_dict(self):
+        """
+        Returns:
+        dict: parameter name -> value (vectors as lists, JSON compatible).
+        """
+        return {name: list(value) if isinstance(value, tuple) else value
+                for name, value in zip(self.names(), self.values())}
+
+#-----------------------------------------------------------------------------------------------------------------------
+#-----------------------------------------------------------------------------------------------------------------------
+
+class parametric_box():
+    # part methods built by parametric_parallel.build_parts
+    part_names = ("top_solid", "wall_solid", "bottom_solid", "top_fillet_solid", "bottom_fillet_solid")
+    # box_parameters defaults overridden by the class
+    defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes the box with the specified parameters, either a
+        box_parameters record or the box_parameters arguments (dim_top,
+        dim_bottom, dim_wall, clearance, ...; see box_parameters).
+        """
+
+        # parameters: a box_parameters record, or its arguments (class defaults apply)
+        if len(args) == 1 and not kwargs and isinstance(args[0], box_parameters):
+            parameters = args[0]
+        else:
+            arguments = inspect.signature(box_parameters).bind(*args, **kwargs).arguments
+            parameters = box_parameters(**dict(self.defaults, **arguments))
+        (dim_top, dim_bottom, dim_wall, clearance, pos_top, pos_bottom, base_type, edge_top, edge_bottom,
+         corners_type, corners_size, fillet_type_top, fillet_dim_top, fillet_size_top, fillet_snap_top,
+         fillet_type_bottom, fillet_dim_bottom, fillet_size_bottom, fillet_snap_bottom,
+         flange_width_top, flange_height_top, flange_width_bottom, flange_height_bottom,
+         snap_top, snap_bottom) = [bd.Vector(*value) if name in box_parameters.vectors else value
+                                   for name, value in zip(box_parameters.names(), parameters.values())]
+
+        # validate inputs
+        if (edge_top.Z < clearance.Z):
+            raise ValueError(f"Edge height ({edge_top.Z}) has to be greatter than clearance at z direction ({clearance.Z})")
+        if (base_type == 0 and fillet_type_bottom == 2):
+            raise ValueError("Fillet as an independent part are not consistent with fused wall + base")
+        if (base_type == 0 and fillet_type_bottom == 4):
+            raise ValueError("Fillet as an independent part are not consistent with fused wall + base")
+        if (base_type == 0 and edge_bottom != bd.Vector(0, 0, 0)):
+            raise ValueError("For fused wall + base, the edge_bottom must be (0,0,0)")
+        if (dim_top.X != dim_bottom.X or dim_top.Y != dim_bottom.Y):
+            raise ValueError("")
+
+
+        # box dimensions and clearances
+        self.dim_top = dim_top
+        self.dim_bottom = dim_bottom
+        self.dim_wall = dim_wall
+        self.clearance = clearance
+        self.pos_top = pos_top
+        self.pos_bottom = pos_bottom
+        # box type
+        self.base_type = base_type
+        self.edge_top = edge_top
+        self.edge_bottom = edge_bottom
+        # corner / z edges
+        self.corners_type = corners_type
+        self.corners_size = corners_size
+        # fillet/chamfer definition for top and bottom
+        self.fillet_type_top = fillet_type_top
+        self.fillet_dim_top = fillet_dim_top
+        self.fillet_size_top = fillet_size_top
+        self.fillet_snap_top = fillet_snap_top
+        self.fillet_type_bottom = fillet_type_bottom
+        self.fillet_dim_bottom = fillet_dim_bottom
+        self.fillet_size_bottom = fillet_size_bottom
+        self.fillet_snap_bottom = fillet_snap_bottom
+        # flange for dettachable top/bottom
+        self.flange_width_top = flange_width_top
+        self.flange_height_top = flange_height_top
+        self.flange_width_bottom = flange_width_bottom
+        self.flange_height_bottom = flange_height_bottom
+        # snaps
+        self.snap_top = snap_top
+        self.snap_bottom = snap_bottom
+
+        # calculate some additional properties
+        self.height = self.dim_bottom.Z + self.dim_wall.Z + self.dim_top.Z + 2 * self.clearance.Z                
+
+        # fillet profiles definition
+        self.pts_fillet_profiles = [fillet_profile_points(t, dim_wall.X, dim_top.Z) for t in range(len(FILLET_PROFILES))]
+
+        return None
+
+    def parameters(self):
+        """
+        Returns:
+        box_parameters: record of the current parameter values.
+        """
+        return box_parameters(**{name: getattr(self, name) for name in box_parameters.names()})
+
+    def __reduce__(self):
+        # ship the parameter record to worker processes (not the memoized
+        # features), the box is rebuilt there by __init__; the other instance
+        # attributes (e.g. board, zif, internal_flange_height of a subclass)
+        # follow as state, so edits made after __init__ are kept
+        state = {name: value for name, value in vars(self).items()
+                 if not name.startswith("_") and name not in box_parameters.names()}
+        return (type(self), (self.parameters(),), state)
+
+    def parts(self):
+        """
+        Parts of the box as a lazy mapping: part name -> Part, each part is
+        built on first access only (see lazy_parts).
+        """
+        return lazy_parts(self)
+
+    def stale(self, name, *args, **kwargs):
+        """
+        True when the feature (or part) has not been computed yet with the
+        current values of the parameters it depends on.
+        """
+        method = _resolve_feature(type(self), name)
+        key = (inspect.unwrap(method).__qualname__, args, tuple(sorted(kwargs.items())))
+        entry = self.__dict__.get("_features", {}).get(key)
+        return entry is None or entry[0] != _feature_fingerprint(self, method)
+
+    def reuse_features(self, other):
+        """
+        Take over the memoized features of another box of the same class (e.g.
+        an older version of this box); the entries invalidated by the parameter
+        differences are recomputed on use.
+        """
+        if type(other) is type(self) and other is not self:
+            self.__dict__.setdefault("_features", {}).update(other.__dict__.get("_features", {}))
+        return None
+
+    def rebuild(self, parts=None, max_workers=1):
+        """
+        Rebuild the parts invalidated since they were last built, reusing every
+        memoized feature that the parameter edits did not invalidate.
+
+        Parameters:
+        parts (list): part names (default: part_names).
+        max_workers (int): 1 rebuilds in this process (incremental); more builds
+                           the stale parts, which are independent branches of the
+                           feature graph, in a process pool (see
+                           parametric_parallel.build_parts).
+
+        Returns:
+        list: the part names that were rebuilt.
+        """
+        stale = [part for part in (parts or self.part_names) if self.stale(part)]
+        if max_workers != 1 and len(stale) > 1:
+            from parametric_parallel import build_parts
+            built = build_parts({"box": self}, stale, max_workers)["box"]
+            memo = self.__dict__.setdefault("_features", {})
+            for part, solid in built.items():
+                method = getattr(type(self), part)
+                memo[(inspect.unwrap(method).__qualname__, (), ())] = (_feature_fingerprint(self, method), solid)
+        else:
+            for part in stale:
+                getattr(self, part)()
+        return stale
+
+    @feature(reads=("snap_top", "dim_top", "flange_height_top"))
+    def _snap_top_sketch(self):
+        # select small side for snap  (PEB: for while top and bottom are equal)
+        if self.snap_top == 1 and self.dim_top.X < self.dim_top.Y:
+            sketch1 = bd.Rectangle(self.dim_top.X/2, self.flange_height_top/4)
+            sketch2 = bd.Rectangle(self.dim_top.X/2 - self.flange_height_top/8, 0.01)            
+        else:
+            sketch1 = bd.Rectangle(self.dim_top.Y/2, self.flange_height_top/4)            
+            sketch2 = bd.Rectangle(self.dim_top.Y/2 - self.flange_height_top/8, 0.01)            
+
+        return sketch1, sketch2
+    
+    @feature(reads=("flange_height_top",), depends=("_snap_top_sketch",))
+    def _snap_top_solid(self):
+        sketch1, sketch2 = self._snap_top_sketch()
+        faces = bd.Sketch() + [
+            bd.Plane.XY * sketch1,
+            bd.Plane.XY.offset(self.flange_height_top/8) * sketch2
+        ]
+        solid = bd.loft(faces)
+        return solid
+
+    @feature(reads=("snap_bottom", "dim_bottom", "flange_height_bottom"))
+    def _snap_bottom_sketch(self):
+        # select small side for snap  (PEB: for while top and bottom are equal)
+        if self.snap_bottom == 1 and self.dim_bottom.X < self.dim_bottom.Y:
+            sketch1 = bd.Rectangle(self.dim_bottom.X/2, self.flange_height_bottom/4)
+            sketch2 = bd.Rectangle(self.dim_bottom.X/2 - self.flange_height_bottom/8, 0.01)            
+        else:
+            sketch1 = bd.Rectangle(self.dim_bottom.Y/2, self.flange_height_bottom/4)            
+            sketch2 = bd.Rectangle(self.dim_bottom.Y/2 - self.flange_height_bottom/8, 0.01)            
+
+        return sketch1, sketch2
+    
+    @feature(reads=("flange_height_bottom",), depends=("_snap_bottom_sketch",))
+    def _snap_bottom_solid(self):
+        sketch1, sketch2 = self._snap_bottom_sketch()
+        faces = bd.Sketch() + [
+            bd.Plane.XY * sketch1,
+            bd.Plane.XY.offset(self.flange_height_bottom/8) * sketch2
+        ]
+        solid = bd.loft(faces)
+        return solid    
+
+    @feature(reads=("fillet_type_top", "dim_top", "fillet_dim_top", "clearance", "corners_type", "corners_size"))
+    def _top_sketch(self):
+        # lid border
+        match self.fillet_type_top:
+            case 0 | 1 | 3:
+                sketch = bd.Rectangle(self.dim_top.X, self.dim_top.Y)
+            case 2 | 4:
+                sketch = bd.Rectangle(self.dim_top.X - 2 * (self.fillet_dim_top.X + self.clearance.X), 
+                                      self.dim_top.Y - 2 * (self.fillet_dim_top.Y + self.clearance.Y)
+                                      )
+    
+        # lid fillet/chamfer
+        match self.corners_type:
+            case 1:
+                sketch = bd.fillet(sketch.vertices(), self.corners_size)      
+            case 2:
+                sketch = bd.chamfer(sketch.vertices(), self.corners_size)                            
+                                  
+        return sketch
+
+    @feature(reads=("edge_top", "flange_width_top"), depends=("_top_sketch",))
+    def _top_flange_sketch(self):
+        sketch1 = bd.offset(self._top_sketch(), amount=-self.edge_top.X)
+        sketch2 = bd.offset(sketch1, amount=-self.flange_width_top)
+        sketch = sketch1 - sketch2
+        return sketch, sketch1
+
+    @feature(reads=("height", "dim_top", "clearance", "flange_height_top", "snap_top"), depends=("_top_flange_sketch", "_snap_top_solid"))
+    def _top_flange_solid(self):
+        sketch, outer_sketch = self._top_flange_sketch()
+        solid = bd.Pos(0,0, (self.height - self.dim_top.Z + self.clearance.Z) - self.flange_height_top) * \
+            bd.extrude(sketch, amount=self.flange_height_top)
+                      
+        # add snap
+        if (self.snap_top != 0):
+            if ((self.snap_top == 1 and self.dim_top.X < self.dim_top.Y) or (self.snap_top == 2 and self.dim_top.X > self.dim_top.Y)):
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(0,1,0)))==1).sort_by(bd.Axis.Y)
+                p1 = bd.Vector(0, outer_sketch.vertices().sort_by(bd.Axis.Y) [0].Y, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                p2 = bd.Vector(0, outer_sketch.vertices().sort_by(bd.Axis.Y)[-1].Y, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+            else:
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(1,0,0)))==1).sort_by(bd.Axis.X)
+                p1 = bd.Vector(outer_sketch.vertices().sort_by(bd.Axis.X)[ 0].X, 0, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                p2 = bd.Vector(outer_sketch.vertices().sort_by(bd.Axis.X)[-1].X, 0, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                
+            # snapshot = solid.edges()   
+            plane = bd.Plane(sorted_faces[0]).shift_origin(p1).reverse()
+            solid -= plane * self._snap_top_solid()
+            # last_edges = solid.edges() - snapshot
+            # solid = bd.chamfer(last_edges.group_by(bd.Axis.Z)[0], self.flange_height_top/64)
+            
+            # snapshot = solid.edges()   
+            plane = bd.Plane(sorted_faces[-1]).shift_origin(p2).reverse()
+            solid -= plane * self._snap_top_solid()  
+            # last_edges = solid.edges() - snapshot
+            # solid = bd.chamfer(last_edges.group_by(bd.Axis.Z)[0], self.flange_height_top/64)
+                      
+        return solid       
+
+    @feature(reads=("pos_top", "height", "edge_top", "clearance", "dim_top", "fillet_type_top", "fillet_size_top"), depends=("_top_sketch", "_top_flange_solid"))
+    @cached_part
+    def top_solid(self):
+        # create (and position) first layer of the top with edge
+        sketch = bd.Pos(self.pos_top) * self._top_sketch()
+        solid = bd.Pos(0, 0, self.height - (self.edge_top.Z - self.clearance.Z))  * \
+            bd.extrude(sketch, self.edge_top.Z - self.clearance.Z)  
+
+        # create (and position) second layer of the top without edge, just below the first layer
+        sketch = bd.offset(sketch, amount=-self.edge_top.X)
+        solid += bd.Pos(0, 0, self.height - self.dim_top.Z) * \
+            bd.extrude(sketch, self.dim_top.Z - (self.edge_top.Z - self.clearance.Z))      
+    
+        # apply fillet/chamfer when necessary
+        match self.fillet_type_top:
+            case 1: # integrated fillet
+                solid = bd.fillet(solid.edges().group_by()[-1], radius=self.fillet_size_top)  
+            case 3: # integrate chamfer
+                solid = bd.chamfer(solid.edges().group_by()[-1], lenght=self.fillet_size_top) 
+    
+        # add external flange
+        solid += self._top_flange_solid()
+    
+        return solid
+
+    @feature(reads=("base_type", "dim_bottom", "fillet_type_top", "fillet_dim_bottom", "clearance", "corners_type", "corners_size"))
+    def _bottom_sketch(self):
+        if self.base_type == 0: 
+            # sketch for base + wall fused
+                sketch = bd.Rectangle(self.dim_bottom.X, self.dim_bottom.Y)
+        else:        
+            # sketch for dettached base
+            match self.fillet_type_top:
+                case 0 | 1 | 3:
+                    sketch = bd.Rectangle(self.dim_bottom.X, self.dim_bottom.Y)
+                case 2 | 4:
+                    sketch = bd.Rectangle(self.dim_bottom.X - 2 * (self.fillet_dim_bottom.X + self.clearance.X), 
+                                          self.dim_bottom.Y - 2 * (self.fillet_dim_bottom.Y + self.clearance.Y)
+                                          )                       
+
+        match self.corners_type:
+            case 1:
+                sketch = bd.fillet(sketch.vertices(), self.corners_size)      
+            case 2:
+                sketch = bd.chamfer(sketch.vertices(), self.corners_size)        
+               
+        return sketch
+
+    @feature(reads=("edge_top", "flange_width_top"), depends=("_bottom_sketch",))
+    def _bottom_flange_sketch(self):
+        sketch1 = bd.offset(self._bottom_sketch(), amount=-self.edge_top.X)
+        sketch2 = bd.offset(sketch1, amount=-self.flange_width_top)
+        sketch = sketch1 - sketch2
+        return sketch, sketch1
+
+    @feature(reads=("dim_bottom", "dim_top", "clearance", "flange_height_bottom", "snap_bottom"), depends=("_bottom_flange_sketch", "_snap_bottom_solid"))
+    def _bottom_flange_solid(self):
+        sketch, outer_sketch = self._bottom_flange_sketch()
+        solid = bd.Pos(0,0, self.dim_bottom.Z- self.clearance.Z) * bd.extrude(sketch, amount=self.flange_height_bottom)
+
+        # add snap
+        if (self.snap_bottom != 0):
+            if ((self.snap_bottom == 1 and self.dim_top.X < self.dim_top.Y) or (self.snap_bottom == 2 and self.dim_top.X > self.dim_top.Y)):
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(0,1,0)))==1).sort_by(bd.Axis.Y)
+                p1 = bd.Vector(0, outer_sketch.vertices().sort_by(bd.Axis.Y)[ 0].Y, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                p2 = bd.Vector(0, outer_sketch.vertices().sort_by(bd.Axis.Y)[-1].Y, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+            else:
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(1,0,0)))==1).sort_by(bd.Axis.X)
+                p1 = bd.Vector(outer_sketch.vertices().sort_by(bd.Axis.X)[ 0].X, 0, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                p2 = bd.Vector(outer_sketch.vertices().sort_by(bd.Axis.X)[-1].X, 0, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                
+            plane = bd.Plane(sorted_faces[0]).shift_origin(p1).reverse()
+            solid -= plane * self._snap_bottom_solid()
+            plane = bd.Plane(sorted_faces[-1]).shift_origin(p2).reverse()
+            solid -= plane * self._snap_bottom_solid()                 
+        return solid    
+    
+    @feature(reads=("pos_top", "edge_bottom", "edge_top", "clearance", "dim_bottom", "fillet_type_bottom",
+                      "fillet_size_bottom", "base_type"), depends=("_bottom_sketch", "_bottom_flange_solid"))
+    @cached_part
+    def bottom_solid(self):
+        # create (and position) first layer of the bottom with edge
+        sketch = bd.Pos(self.pos_top) * self._bottom_sketch()
+        solid = bd.Pos(0, 0, 0)  * bd.extrude(sketch, self.edge_bottom.Z - self.clearance.Z)  
+
+        # create (and position) second layer of the top without edge, just aboxe the first layer
+        sketch = bd.offset(sketch, amount=-self.edge_top.X)
+        solid += bd.Pos(0, 0, self.edge_bottom.Z - self.clearance.Z) * bd.extrude(sketch, self.dim_bottom.Z - (self.edge_bottom.Z - self.clearance.Z))  
+ 
+        # apply fillet/chamfer when necessary for fused 
+        match self.fillet_type_bottom:
+            case 1: # integrated fillet
+                solid = bd.fillet(solid.edges().group_by()[0], radius=self.fillet_size_bottom)      
+            case 3: # integrate chamfer
+                solid = bd.chamfer(solid.edges().group_by()[0], lenght=self.fillet_size_bottom)      
+
+        match self.base_type:
+            case 0:
+                solid += wall_solid()
+            case 1:
+                solid += self._bottom_flange_solid()
+                            
+        return solid        
+  
+    @feature(reads=("dim_bottom", "dim_wall", "corners_type", "corners_size", "edge_top"))
+    def _wall_sketch(self):
+        perimeter_external = bd.Rectangle(self.dim_bottom.X, self.dim_bottom.Y)
+
+        match self.corners_type:
+            case 1:
+                perimeter_external = bd.fillet(perimeter_external.vertices(), self.corners_size + self.dim_wall.X)      
+            case 2:
+                perimeter_external = bd.chamfer(perimeter_external.vertices(), self.corners_size  + self.dim_wall.X)   
+                        
+        perimeter_internal         = bd.offset(perimeter_external, amount=-self.dim_wall.X, mode=bd.Mode.INTERSECT)
+        perimeter_internal_top     = bd.offset(perimeter_external, amount=-(self.dim_wall.X + self.edge_top.X), mode=bd.Mode.INTERSECT)
+        perimeter_internal_bottom  = bd.offset(perimeter_external, amount=-(self.dim_wall.X + self.edge_top.X), mode=bd.Mode.INTERSECT)
+
+        wall        = perimeter_external - perimeter_internal
+        wall_top    = perimeter_external - perimeter_internal_top
+        wall_bottom = perimeter_external - perimeter_internal_bottom
+
+        return wall, wall_top, wall_bottom,  perimeter_internal,  perimeter_internal_top,  perimeter_internal_bottom, perimeter_external
+
+    @feature(reads=("dim_wall",), depends=("_wall_sketch",))
+    def _fillet_snap_sketch(self):
+        _, _, _, _, _, _, sketch = self._wall_sketch()
+        sketch = bd.offset(sketch, amount=-self.dim_wall.X/2) - \
+                 bd.offset(sketch, amount=-self.dim_wall.X/2-self.dim_wall.X/4)
+        return sketch
+
+    @feature(reads=("dim_wall",), depends=("_fillet_snap_sketch",))
+    def _fillet_snap_solid(self):
+        sketch = self._fillet_snap_sketch()
+        solid = bd.extrude(sketch, amount=self.dim_wall.X/8, taper=45)
+        return solid
+     
+    def wall_z_range(self, wider_top=True, wider_bottom=True):
+        """
+        Z coordinates of the bottom and top of the wall solid, computed from the
+        parameters with the same layer stack used by wall_solid (bottom layer,
+        bottom interface, body, top interface, top layer).
+        """
+        cbase = [0, self.clearance.Z][wider_bottom]
+        ctop  = [0, self.clearance.Z][wider_top]
+        z_min = self.dim_bottom.Z + cbase
+        z_max = z_min + (2 + 0.5)*self.dim_bottom.Z + \
+                (self.height - 2 * (1 + 2 + 0.5)*self.dim_bottom.Z - cbase - ctop) + \
+                (0.5 + 2)*self.dim_top.Z
+        return z_min, z_max
+
+    def wall_face(self, side, wider_top=True, wider_bottom=True):
+        """
+        Analytic geometry of the flat external face of the wall on one side,
+        without building the wall solid.
+
+        Parameters:
+        side (str): "-X", "+X", "-Y" or "+Y", the direction the face is facing.
+        wider_top, wider_bottom (bool): same meaning as in wall_solid.
+
+        Returns:
+        tuple: (height, width, center) - the face extent along Z, its extent
+        along the wall and its center (bd.Vector).
+        """
+        # the corners (fillet or chamfer) shorten the flat part of each side
+        corner = [0, self.corners_size + self.dim_wall.X, self.corners_size + self.dim_wall.X][self.corners_type]
+        z_min, z_max = self.wall_z_range(wider_top, wider_bottom)
+        height = z_max - z_min
+
+        match side:
+            case "-X" | "+X":
+                width = self.dim_bottom.Y - 2 * corner
+                center = bd.Vector([-1, 1][side == "+X"] * self.dim_bottom.X/2, 0, (z_min + z_max)/2)
+            case "-Y" | "+Y":
+                width = self.dim_bottom.X - 2 * corner
+                center = bd.Vector(0, [-1, 1][side == "+Y"] * self.dim_bottom.Y/2, (z_min + z_max)/2)
+            case _:
+                raise ValueError(f"Invalid wall side ({side}), use -X, +X, -Y or +Y")
+
+        return height, width, center
+
+    @feature(reads=("dim_bottom", "dim_top", "dim_wall", "clearance", "height", "fillet_snap_top", "fillet_snap_bottom",
+                      "snap_top", "snap_bottom", "flange_height_top", "flange_height_bottom"), depends=("_wall_sketch", "_fillet_snap_solid", "_snap_top_solid", "_snap_bottom_solid"))
+    @cached_part
+    def wall_solid(self, wider_top=True, wider_bottom=True):
+        wall, wall_top, wall_bottom,  perimeter_internal,  perimeter_internal_top,  perimeter_internal_bottom, _ = self._wall_sketch()
+
+        (sbase, ibase, cbase) = [(wall, perimeter_internal, 0), (wall_bottom, perimeter_internal_bottom, self.clearance.Z)][wider_bottom]
+        (stop, itop, ctop)    = [(wall, perimeter_internal, 0), (wall_top,    perimeter_internal_top,    self.clearance.Z)][wider_top]
+    
+        # bottom layer
+        solid = bd.Pos(0, 0, self.dim_bottom.Z + cbase) * bd.extrude(sbase, amount=2*self.dim_bottom.Z)  # PEB IMPROVE HEIGHT
+
+        # interface bottom - body 
+        plane = bd.Plane(solid.faces().sort_by().last)
+        solid += (bd.loft([plane * sbase, plane.offset(self.dim_bottom.Z/2) * wall]) - 
+                 bd.loft([plane * ibase, plane.offset(self.dim_bottom.Z/2) * perimeter_internal]) )
+
+        # body layer
+        plane = bd.Plane(solid.faces().sort_by().last)
+        solid += plane * bd.extrude(wall, amount=self.height - 2 * (1 + 2 + 0.5)*self.dim_bottom.Z - cbase - ctop)
+
+        # interface body - top
+        plane = bd.Plane(solid.faces().sort_by().last)
+        solid += (bd.loft([plane * wall, plane.offset(self.dim_top.Z/2) * stop]) - 
+                 bd.loft([plane * perimeter_internal, plane.offset(self.dim_top.Z/2) * itop]) )
+
+        # top layer
+        plane = bd.Plane(solid.faces().sort_by().last)
+        solid += plane * bd.extrude(stop, amount=2*self.dim_top.Z)
+
+        #add top fillet snap
+        if (self.fillet_snap_top):        
+            plane = bd.Plane(solid.faces().sort_by().last)
+            solid += plane * self._fillet_snap_solid()
+
+        #add bottom fillet snap
+        if (self.fillet_snap_bottom):        
+            plane = bd.Plane(solid.faces().sort_by().first).reverse()
+            solid += plane * bd.mirror(self._fillet_snap_solid(), about=bd.Plane.XY)
+            
+        # add lid snap
+        if (self.snap_top != 0):
+            if ((self.snap_top == 1 and self.dim_top.X < self.dim_top.Y) or (self.snap_top == 2 and self.dim_top.X > self.dim_top.Y)):
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(0,1,0)))==1).sort_by(bd.Axis.Y)
+                p1 = bd.Vector(0, perimeter_internal_top.vertices().sort_by(bd.Axis.Y) [0].Y, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                p2 = bd.Vector(0, perimeter_internal_top.vertices().sort_by(bd.Axis.Y)[-1].Y, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+            else:
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(1,0,0)))==1).sort_by(bd.Axis.X)
+                p1 = bd.Vector(perimeter_internal_top.vertices().sort_by(bd.Axis.X)[ 0].X, 0, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                p2 = bd.Vector(perimeter_internal_top.vertices().sort_by(bd.Axis.X)[-1].X, 0, self.height -(self.dim_top.Z+self.flange_height_top-self.clearance.Z-self.flange_height_top/8))
+                
+            plane = bd.Plane(sorted_faces[2]).shift_origin(p1)
+            solid += plane * self._snap_top_solid()
+            plane = bd.Plane(sorted_faces[-3]).shift_origin(p2)
+            solid += plane * self._snap_top_solid()
+            
+        # add base snap
+        if (self.snap_bottom != 0):
+            pts = [(0, 0), (2.75, 0), (4.45, 1.7), (-4.45, 1.7), (-2.75, 0), (0, 0)]
+            ln = bd.Polyline(pts)
+
+            if ((self.snap_bottom & 1 and self.dim_top.X < self.dim_top.Y) or (self.snap_bottom & 2 and self.dim_top.X > self.dim_top.Y)):
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(0,1,0)))==1).sort_by(bd.Axis.Y)
+                p1 = bd.Vector(0, perimeter_internal_bottom.vertices().sort_by(bd.Axis.Y)[ 0].Y, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                p2 = bd.Vector(0, perimeter_internal_bottom.vertices().sort_by(bd.Axis.Y)[-1].Y, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                sketch = bd.Pos(0, 0, sorted_faces[-1].width/2-0.85) * bd.make_face(bd.Plane(sorted_faces[-1]).reverse() * ln)
+                amount = self.dim_wall.X*2
+            else:
+                sorted_faces = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(1,0,0)))==1).sort_by(bd.Axis.X)
+                p1 = bd.Vector(perimeter_internal_bottom.vertices().sort_by(bd.Axis.X)[ 0].X, 0, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                p2 = bd.Vector(perimeter_internal_bottom.vertices().sort_by(bd.Axis.X)[-1].X, 0, self.dim_bottom.Z+self.flange_height_bottom-self.clearance.Z-self.flange_height_bottom/8)
+                sketch = bd.Pos(0, 0, sorted_faces[-1].width/2-0.85) * bd.make_face(bd.Plane(sorted_faces[-1]) * ln)
+                amount = -self.dim_wall.X*2
+            
+            plane = bd.Plane(sorted_faces[2]).shift_origin(p1)
+            solid += plane * self._snap_bottom_solid()
+            plane = bd.Plane(sorted_faces[-3]).shift_origin(p2)
+            solid += plane * self._snap_bottom_solid()     
+            
+            solid -= bd.extrude(sketch, amount=amount)
+            
+        # hole for the screw driver
+
+
+        return solid
+ 
+    @feature(depends=("_bottom_sketch", "_top_sketch"))
+    def _fillet_path_sketch(self, bottom_top):
+        match bottom_top:
+            case 0: # bottom
+                _sketch = self._bottom_sketch()
+            case 1: # top
+                _sketch = self._top_sketch()
+        return _sketch
+
+    @feature(reads=("clearance",), depends=("_fillet_path_sketch",))
+    def _fillet_path(self, bottom_top):
+        # ordered path adjusted for clearance
+        _, _path = FILLET_ENGINE.path(self._fillet_path_sketch(bottom_top), self.clearance.X)
+        return _path 
+
+    @feature(reads=("pts_fillet_profiles",))
+    def _fillet_sketch(self, _fillet_type):
+        # create profile
+        _sketch =  bd.Polyline(self.pts_fillet_profiles[_fillet_type])
+
+        return _sketch
+         
+    @feature(reads=("dim_wall", "dim_top", "dim_bottom", "clearance", "height"), depends=("_fillet_path_sketch",))
+    def _fillet_solid(self, _bottom_top, _type):
+        # sweep the profile along the fillet path (shared with parametric_fillet)
+        solid, _ = FILLET_ENGINE.solid(_type, _bottom_top, self.dim_wall.X, self.dim_top.Z,
+                                       self._fillet_path_sketch(_bottom_top), self.clearance.X,
+                                       fillet_position(self, _bottom_top, _type))
+        return solid
+    
+    @feature(depends=("_fillet_solid",))
+    @cached_part
+    def top_fillet_solid(self):
+        solid = self._fillet_solid(_bottom_top=1, _type=1)
+
+        return solid 
+  
+    @feature(depends=("_fillet_solid",))
+    @cached_part
+    def bottom_fillet_solid(self):
+        solid = self._fillet_solid(_bottom_top=0, _type=1)
+
+        return solid 
+  
+#-----------------------------------------------------------------------------------------------------------------------
+#-----------------------------------------------------------------------------------------------------------------------
+  
+class gm328A_case(parametric_box):
+    part_names = parametric_box.part_names + ("board_solid",)
+    defaults = {"fillet_type_top": 2, "fillet_type_bottom": 2}
+
+    def __init__(self, *args, **kwargs):
+        # same parameters as parametric_box (see box_parameters)
+        super().__init__(*args, **kwargs)
+
+        # specific properties
+        self.board = board()
+        self.zif = zif(pos=bd.Vector(self.board.d.X/2 - 14.5, 
+                                      self.board.d.Y/2 + self.clearance.Y, 
+                                      self.dim_bottom.Z + self.clearance.Z + self.board.solder + self.board.d.Z),
+                        edge = self.edge_top.Y
+                        )
+        self.internal_flange_height = 10
+        return None
+
+    @feature(reads=("zif", "board", "flange_width_top"))
+    def _internal_flange_sketch(self):
+        szif = self.zif.sketch()
+        sinternal_flange = bd.offset(szif, amount=self.flange_width_top/2) - szif 
+        plane = bd.Plane.XZ.offset(-self.board.d.Y/2)
+        sinternal_flange = bd.split(sinternal_flange, bisect_by=plane)
+        return sinternal_flange
+
+    @feature(reads=("height", "dim_top", "clearance", "internal_flange_height"), depends=("_internal_flange_sketch",))
+    def _internal_flange_solid(self):
+        _s = self._internal_flange_sketch()
+        internal_flange = bd.Pos(0,0, (self.height  - self.dim_top.Z + self.clearance.Z) - self.internal_flange_height) * bd.extrude(_s, amount=self.internal_flange_height)
+        return internal_flange
+
+    @feature(reads=("board", "zif", "height", "dim_top", "dim_bottom", "dim_wall", "clearance", "fillet_dim_top", "edge_top"))
+    def _top_cutouts(self):
+        tools = []
+
+        # LCD
+        lcd_position = bd.Vector(-self.board.d.X/2 + 6.9,  -self.board.d.Y/2 + 8.95, self.height - self.dim_top.Z)
+        tools.append(lcd(pos=lcd_position, clearance=self.clearance).solid_hole_upwards())
+
+        # LCD screws
+        tools.append(lcd(pos=lcd_position, clearance=self.clearance).solid_screws(self))
+
+        # encoder
+        enc_position = bd.Vector(self.board.d.X/2 - 2.5, -self.board.d.Y/2 + 3.50, self.height - self.dim_top.Z)
+        tools.append(encoder(pos=enc_position).solid_hole_upwards())
+
+        # led
+        led_position = bd.Vector(-self.board.d.X/2 + 3, -self.board.d.Y/2 + 6.5, self.height - self.dim_top.Z)
+        tools.append(led(pos=led_position).solid_hole_upwards())
+
+        # mkdns
+        tools.append(bd.Pos(0, 0, self.height - self.dim_top.Z) * mkdsn(self.board, self.clearance.X).solid_hole_upwards())
+
+        # zif
+        tools.append(self.zif.solid_hole_outwards())
+
+        # plug
+        plug_position = bd.Vector(8.15, -self.board.d.Y/2, self.dim_bottom.Z + self.board.solder + self.board.d.Z)
+        tools.append(plug(plug_position).solid_hole_outwards())
+
+        # space for mkdns plugs
+        tools.append(mkdsn(self.board, self.clearance.X).solid_enclosed_volume(self))
+
+        # space for power plugs
+        tools.append(plug(plug_position).solid_enclosed_volume(self))
+
+        return tools
+
+    @feature(depends=("parametric_box.top_solid", "_internal_flange_solid", "_top_cutouts"))
+    @cached_part
+    def top_solid(self):
+        solid = parametric_box.top_solid(self)
+
+        # add internal flange
+        solid += self._internal_flange_solid()
+
+        # remove components openings
+        solid = cut_tools(solid, self._top_cutouts())
+
+        return solid
+
+    @feature(reads=("board", "flange_height_bottom", "corners_type", "corners_size", "dim_wall", "dim_bottom", "dim_top", "clearance", "height"), depends=("parametric_box.bottom_solid",))
+    @cached_part
+    def bottom_solid(self):
+        solid = parametric_box.bottom_solid(self)
+                
+        # add connector (sized by the wall leftmost face, no need to build the wall)
+        height, width, _ = self.wall_face("-X")
+
+        bottommost = solid.faces().filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(0,0,1)))==1).sort_by(bd.Axis.Z)[0]
+        center = bottommost.center_location.position
+        center.X = bottommost.vertices().sort_by(bd.Axis.X)[0].X + height/2        
+
+        hr = [loc * bd.Rot(0, -90, 0) * connector().hole_reinforcement()
+              for loc in bd.Locations((center.X+height/6, center.Y-width/2+5, center.Z+connector().length_reinf),
+                                      (center.X-height/8, center.Y+0,         center.Z+connector().length_reinf),
+                                      (center.X+height/6, center.Y+width/2-5, center.Z+connector().length_reinf),)] 
+        he = [loc * bd.Rot(0, -90, 0) * connector().hole_empty()
+             for loc in bd.Locations((center.X+height/6, center.Y-width/2+5, center.Z+connector().length_empty),
+                                     (center.X-height/8, center.Y+0,         center.Z+connector().length_empty),
+                                     (center.X+height/6, center.Y+width/2-5, center.Z+connector().length_empty))]                
+        mr = [loc * bd.Rot(0, -90, 0) * magneto().hole_reinforcement()
+              for loc in bd.Locations((center.X-height*0, center.Y-width/10, center.Z+magneto().length_reinf),
+                                      (center.X-height*0, center.Y+width/10, center.Z+magneto().length_reinf))]                
+        me = [loc * bd.Rot(0, -90, 0) * magneto().hole_empty()
+              for loc in bd.Locations((center.X-height*0, center.Y-width/10, center.Z+magneto().length_empty),
+                                      (center.X-height*0, center.Y+width/10, center.Z+magneto().length_empty))]                
+        solid += hr
+        solid -= he   
+        solid += mr
+        solid -= me           
+
+
+        # add board fixers
+        locations = bd.Locations((self.board.dxy.X, self.board.dxy.Y, self.dim_bottom.Z-self.clearance.Z),
+                                 (self.board.dxY.X, self.board.dxY.Y, self.dim_bottom.Z-self.clearance.Z),
+                                 (self.board.dXy.X, self.board.dXy.Y, self.dim_bottom.Z-self.clearance.Z),
+                                 (self.board.dXY.X, self.board.dXY.Y, self.dim_bottom.Z-self.clearance.Z))            
+        hr = [loc * bd.Cylinder(radius=self.board.hole_pos-0.2, height=self.flange_height_bottom, align=(bd.Align.CENTER,bd.Align.CENTER,bd.Align.MIN))
+              for loc in locations]    
+        he = [loc * bd.Cylinder(radius=3/2, height=self.flange_height_bottom, align=(bd.Align.CENTER,bd.Align.CENTER,bd.Align.MIN))
+              for loc in locations]
+        solid += hr
+        solid -= he  
+
+        return solid 
+
+    @feature(reads=("corners_type", "corners_size", "dim_wall", "dim_bottom", "dim_top", "clearance", "height"))
+    def _wall_connectors(self):
+        # connector and magneto holes, placed on the wall leftmost face (no need to build the wall)
+        height, width, center = self.wall_face("-X")
+        hr = [loc * connector().hole_reinforcement()
+              for loc in bd.Locations((center.X+connector().length_reinf, center.Y-width/2+5, center.Z-height/6),
+                                      (center.X+connector().length_reinf, center.Y+0,         center.Z+height/8),
+                                      (center.X+connector().length_reinf, center.Y+width/2-5, center.Z-height/6),)] 
+        he = [loc * connector().hole_empty()
+             for loc in bd.Locations((center.X+connector().length_empty, center.Y-width/2+5, center.Z-height/6),
+                                     (center.X+connector().length_empty, center.Y+0,         center.Z+height/8),
+                                     (center.X+connector().length_empty, center.Y+width/2-5, center.Z-height/6))]                
+        mr = [loc * magneto().hole_reinforcement()
+              for loc in bd.Locations((center.X+magneto().length_reinf, center.Y-width/10, center.Z+height*0),
+                                      (center.X+magneto().length_reinf, center.Y+width/10, center.Z+height*0))]                
+        me = [loc * magneto().hole_empty()
+              for loc in bd.Locations((center.X+magneto().length_empty, center.Y-width/10, center.Z+height*0),
+                                      (center.X+magneto().length_empty, center.Y+width/10, center.Z+height*0))]                
+        return hr, he, mr, me
+
+    @feature(depends=("parametric_box.wall_solid", "_wall_connectors", "_wall_cutouts"))
+    @cached_part
+    def wall_solid(self):
+        solid = parametric_box.wall_solid(self)
+
+        # add connector
+        hr, he, mr, me = self._wall_connectors()
+        solid += hr
+        solid -= he   
+        solid += mr
+
+        # remove magneto holes and components openings
+        solid = cut_tools(solid, me + self._wall_cutouts())
+
+        return solid
+   
+    @feature(reads=("board", "zif", "dim_bottom", "clearance"))
+    def _wall_cutouts(self):
+        tools = []
+
+        # zif open
+        tools.append(self.zif.solid_hole_outwards())
+
+        # plug
+        plug_position = bd.Vector(8.15, -self.board.d.Y/2, self.dim_bottom.Z + self.board.solder + self.board.d.Z)
+        tools.append(plug(plug_position).solid_hole_outwards())
+
+        # mkdsn (PEB - THIS IS HORRIBLE)
+        tools.append(bd.Pos(0, 0, 0) * mkdsn(self.board, self.clearance.X).solid_hole_outwards(self))
+
+        return tools
+
+    @feature(reads=("zif",))
+    def _top_fillet_cutouts(self):
+        # zif open
+        return [self.zif.solid_hole_outwards()]
+
+    @feature(depends=("parametric_box.top_fillet_solid", "_top_fillet_cutouts"))
+    @cached_part
+    def top_fillet_solid(self):
+        solid = parametric_box.top_fillet_solid(self)
+
+        # remove components openings
+        solid = cut_tools(solid, self._top_fillet_cutouts())
+
+        return solid 
+    
+    @feature(reads=("board", "dim_wall"))
+    @cached_part
+    def board_solid(self):
+        solid = self.board.solid()
+        solid = bd.Pos(0, 0, self.dim_wall.X + self.board.solder + self.board.d.Z/2) * solid
+
+        return solid
+               
+class gm328A_battery(parametric_box):
+    defaults = {"fillet_type_top": 2, "fillet_type_bottom": 2}
+
+    @feature(reads=("corners_type", "corners_size", "dim_wall", "dim_bottom", "dim_top", "clearance", "height"))
+    def _wall_connectors(self):
+        # connectors and magneto holes, placed on the wall rightmost face
+        height, width, center = self.wall_face("+X")
+        cs = [loc * connector().solid()
+             for loc in bd.Locations((center.X+connector().length, center.Y-width/2+5, center.Z-height/6),
+                                     (center.X+connector().length, center.Y+0,         center.Z+height/8),
+                                     (center.X+connector().length, center.Y+width/2-5, center.Z-height/6))]                
+        mr = [loc * magneto().hole_reinforcement()
+              for loc in bd.Locations((center.X, center.Y-width/10, center.Z+height*0),
+                                      (center.X, center.Y+width/10, center.Z+height*0))]                
+        me = [loc * magneto().hole_empty()
+              for loc in bd.Locations((center.X, center.Y-width/10, center.Z+height*0),
+                                      (center.X, center.Y+width/10, center.Z+height*0))]                
+        return cs, mr, me
+
+    @feature(depends=("parametric_box.wall_solid", "_wall_connectors"))
+    @cached_part
+    def wall_solid(self):
+        solid = parametric_box.wall_solid(self)
+
+        # add connector
+        cs, mr, me = self._wall_connectors()
+        solid += cs
+        solid += mr
+        solid -= me     
+
+        return solid
+
+##-----------------------------------------------------------------------------------------------------------------------
+##----------------------------------------------------------------------------------------------------------------------
+
+
+#*******************
+# SERIALIZATION AND EXPORT
+#*******************
+# bd.Vector wraps an OCP gp_Vec that cannot be pickled: rebuild it from its coordinates
+copyreg.pickle(bd.Vector, lambda v: (bd.Vector, (v.X, v.Y, v.Z)))
+
+
+def shape_to_brep(shape):
+    """
+    Serialize a Shape into a BREP string (bytes).
+    """
+    buffer = io.BytesIO()
+    bd.export_brep(shape, buffer)
+    return buffer.getvalue()
+
+
+def brep_to_part(data):
+    """
+    Rebuild a Part from a BREP string created by shape_to_brep.
+    """
+    shape = TopoDS_Shape()
+    BRepTools.Read_s(shape, io.BytesIO(data), BRep_Builder())
+    return bd.Part(shape)
+
+
+def export_part(solid, path):
+    """
+    Export a part to a file, the format is taken from the file extension
+    (.stl, .3mf or .step).
+    """
+    match os.path.splitext(path)[1].lower():
+        case ".stl":
+            bd.export_stl(solid, path)
+        case ".step":
+            bd.export_step(solid, path)
+        case ".3mf":
+            mesher = bd.Mesher()
+            mesher.add_shape(solid)
+            mesher.write(path)
+        case extension:
+            raise ValueError(f"Unsupported export format ({extension})")
+    return None
+
+
+#*******************
+# PARAMETER FILES
+#*******************
+def box_class(name):
+    """
+    Returns:
+    type: the box class (parametric_box or a subclass) of a class name.
+    """
+    cls = globals().get(name)
+    if not (isinstance(cls, type) and issubclass(cls, parametric_box)):
+        raise ValueError(f"Unknown box class ({name})")
+    return cls
+
+
+def box_from_parameters(parameters):
+    """
+    Create a box from plain (JSON) parameters.
+
+    Parameters:
+    parameters (dict): "class" (parametric_box or a subclass name, default
+                       parametric_box) and the constructor arguments; lists of
+                       3 numbers are converted to bd.Vector.
+
+    Returns:
+    parametric_box: the box instance.
+    """
+    parameters = dict(parameters)
+    cls = box_class(parameters.pop("class", "parametric_box"))
+    kwargs = {}
+    for name, value in parameters.items():
+        if isinstance(value, list) and len(value) == 3 and all(isinstance(v, (int, float)) for v in value):
+            value = bd.Vector(*value)
+        kwargs[name] = value
+    return cls(**kwargs)
+
+
+def load_parameter_file(path):
+    """
+    Read a JSON parameter file with one entry per box (see box_from_parameters).
+
+    Returns:
+    dict: name -> box instance.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return {name: box_from_parameters(parameters) for name, parameters in data.items()}
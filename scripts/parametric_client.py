@@ -0,0 +1,146 @@
+# GM328A Case - client of the warm build daemon
+#
+# Talks to parametric_daemon.py over its local socket with JSON messages:
+# boxes are sent as plain parameter dicts (see
+# parametric_case.box_from_parameters) and the daemon builds and exports the
+# parts. This module does not import build123d nor the model code, so a thin
+# client starts in a few milliseconds:
+#
+#   with daemon_client() as daemon:
+#       daemon.export(parameters["case"], "case", ["out/case_{part}.stl"], parts=["top_solid"])
+import json
+import os
+import secrets
+from multiprocessing.connection import Client
+
+DAEMON_DIRECTORY = os.environ.get("PARAMETRIC_CASE_DAEMON",
+                                  os.path.join(os.path.expanduser("~"), ".cache", "parametric_case", "daemon"))
+
+
+def default_address():
+    # unix socket next to the key file, loopback TCP where unix sockets do not exist
+    if hasattr(os, "fork"):
+        return os.path.join(DAEMON_DIRECTORY, "daemon.sock")
+    return ("127.0.0.1", 6328)
+
+
+def daemon_authkey(create=False):
+    # shared secret of the daemon and its clients, readable by the user only
+    path = os.path.join(DAEMON_DIRECTORY, "daemon.key")
+    if create and not os.path.isfile(path):
+        os.makedirs(DAEMON_DIRECTORY, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(32))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def send_message(connection, message):
+    # one JSON document per message, both ways
+    connection.send_bytes(json.dumps(message).encode())
+    return None
+
+
+def receive_message(connection):
+    return json.loads(connection.recv_bytes())
+
+
+def plain_parameters(box):
+    """
+    Returns:
+    dict: the plain (JSON) parameters of a box, given as a parameter dict or as
+    a parametric_box instance (only its parameter record is kept).
+    """
+    if isinstance(box, dict):
+        return box
+    return dict(box.parameters().as_dict(), **{"class": type(box).__name__})
+
+
+#*******************
+# CLIENT
+#*******************
+class daemon_client():
+    """
+    Connection to a running build_daemon.
+
+        with daemon_client() as daemon:
+            parts = daemon.build(case, "case", parts=["top_solid"])     # part name -> Part
+    """
+    def __init__(self, address=None):
+        # instance properties
+        self.address = address or default_address()
+        self.connection = Client(self.address, authkey=daemon_authkey())
+        return None
+
+    def request(self, op, **arguments):
+        send_message(self.connection, dict(arguments, op=op))
+        response = receive_message(self.connection)
+        if response["status"] != "ok":
+            raise RuntimeError(f"Build daemon: {response['error']}")
+        return response
+
+    def ping(self):
+        return self.request("ping")
+
+    def build(self, box, name=None, parts=None, meshes=None, mesh_tolerance=(1e-3, 0.1), timings=None):
+        """
+        Build parts of a box in the daemon and receive them in this process
+        (imports build123d, see export for a thin client).
+
+        Parameters:
+        box (dict or parametric_box): plain parameters (with "class") or a box,
+                    only its parameter record is sent.
+        name (str): box name; successive versions of a named box share their
+                    unchanged features in the daemon.
+        parts (list): part names (default: all the parts of the box).
+        meshes (dict): optional, filled with part -> shared_mesh.
+        timings (dict): optional, filled with part -> build time in the daemon.
+
+        Returns:
+        dict: part name -> Part.
+        """
+        from parametric_parallel import receive_part
+        response = self.request("build", box=plain_parameters(box), name=name, parts=parts,
+                                mesh=mesh_tolerance if meshes is not None else None)
+        results = {}
+        for part, handle in response["parts"].items():
+            results[part], shared = receive_part(handle)
+            if meshes is not None:
+                meshes[part] = shared
+        if timings is not None:
+            timings.update(response["timings"])
+        return results
+
+    def export(self, box, name, paths, parts=None):
+        """
+        Build parts of a box and export them, both in the daemon.
+
+        Parameters:
+        box (dict or parametric_box): see build.
+        name (str): box name (see build).
+        paths (list): file paths, "{part}" is replaced by the part name; the
+                      format is taken from the file extension (see
+                      parametric_case.export_part).
+        parts (list): part names (default: all the parts of the box).
+
+        Returns:
+        dict: part name -> {paths, build, export} (absolute paths, seconds).
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        return self.request("export", box=plain_parameters(box), name=name, paths=paths, parts=parts)["parts"]
+
+    def shutdown(self):
+        self.request("shutdown")
+        return None
+
+    def close(self):
+        self.connection.close()
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,196 @@
+# GM328A Case - persistent warm build daemon
+#
+# Keeps build123d/OCP, the model classes and the warm caches (boxes with their
+# memoized features, fillet engine) loaded in a long lived process and builds
+# parts on request over a local socket. Parts come back through shared memory
+# (see parametric_parallel.share_part), or are exported by the daemon itself,
+# so a lid rebuild after a parameter edit only pays for the invalidated
+# features. Clients (see parametric_client.py) send JSON requests with plain
+# box parameters and need neither build123d nor the model code.
+#
+#   python parametric_daemon.py serve --warm gm328a_parameters.json &
+#   python gm328a_build.py --boxes case --parts top_solid --daemon
+#   python parametric_daemon.py stop
+import argparse
+import collections
+import os
+import time
+import traceback
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Listener
+import parametric_case as pc
+import parametric_parallel as pp
+from parametric_client import daemon_authkey, daemon_client, default_address, receive_message, send_message
+
+
+#*******************
+# DAEMON
+#*******************
+class build_daemon():
+    """
+    Serve build requests from a warm process, one request at a time.
+
+    Boxes are kept (least recently used first out) by class and name. A request
+    for a known name takes over the memoized features of the previous version
+    of the box (see parametric_box.reuse_features): only the features
+    invalidated by the parameter changes are rebuilt.
+    """
+    def __init__(self, address=None, max_boxes=16):
+        # instance properties
+        self.address = address or default_address()
+        self.max_boxes = max_boxes
+        self.boxes = collections.OrderedDict()
+        self.requests = 0
+        return None
+
+    def box(self, box, name=None):
+        # warm instance for a box (built from the parameters of a client request)
+        key = (type(box).__name__, name)
+        previous = self.boxes.pop(key, None)
+        if previous is not None:
+            box.reuse_features(previous)
+        self.boxes[key] = box
+        while len(self.boxes) > self.max_boxes:
+            self.boxes.popitem(last=False)
+        return box
+
+    def warm(self, boxes):
+        """
+        Build every part of some boxes once (loads the feature memos, the fillet
+        engine and the part cache).
+
+        Parameters:
+        boxes (dict): name -> box.
+        """
+        for name, box in boxes.items():
+            box = self.box(box, name)
+            for part in box.part_names:
+                getattr(box, part)()
+        return None
+
+    def _parts(self, box, parts):
+        # requested part names, checked against the box
+        for part in parts:
+            if part not in box.part_names:
+                raise ValueError(f"{type(box).__name__} has no part {part}")
+        return parts
+
+    def build(self, box, name=None, parts=None, mesh=None):
+        box = self.box(box, name)
+        handles, timings = {}, {}
+        try:
+            for part in self._parts(box, parts or box.part_names):
+                start = time.perf_counter()
+                handles[part] = pp.share_part(getattr(box, part)(), mesh)
+                timings[part] = time.perf_counter() - start
+        except BaseException:
+            # the client never hears of the parts already shared
+            for handle in handles.values():
+                pp.unlink_segment(handle["name"])
+            raise
+        return {"parts": handles, "timings": timings}
+
+    def export(self, box, name, paths, parts=None):
+        # build and export in the daemon: the client only gets the paths and timings back
+        box = self.box(box, name)
+        results = {}
+        for part in self._parts(box, parts or box.part_names):
+            start = time.perf_counter()
+            solid = getattr(box, part)()
+            t_build = time.perf_counter() - start
+            files = [path.replace("{part}", part) for path in paths]
+            for path in files:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                pc.export_part(solid, path)
+            results[part] = {"paths": files, "build": t_build, "export": time.perf_counter() - start - t_build}
+        return {"parts": results}
+
+    def handle(self, request):
+        self.requests += 1
+        match request.get("op"):
+            case "ping":
+                return {"pid": os.getpid(), "requests": self.requests, "boxes": len(self.boxes)}
+            case "build":
+                return self.build(pc.box_from_parameters(request["box"]), request.get("name"), request.get("parts"),
+                                  request.get("mesh"))
+            case "export":
+                return self.export(pc.box_from_parameters(request["box"]), request.get("name"), request["paths"],
+                                   request.get("parts"))
+            case "clear":
+                self.boxes.clear()
+                pc.FILLET_ENGINE.clear()
+                return {}
+            case op:
+                raise ValueError(f"Unknown request ({op})")
+
+    def _respond(self, connection, response, segments=()):
+        # send a response; the client unlinks the shared memory segments it gets
+        try:
+            send_message(connection, response)
+        except BaseException:
+            for name in segments:
+                pp.unlink_segment(name)
+            raise
+        for name in segments:
+            # delivered: this process must not unlink them at exit anymore
+            resource_tracker.unregister("/" + name, "shared_memory")
+        return None
+
+    def serve(self):
+        """
+        Accept clients until a "shutdown" request.
+        """
+        if isinstance(self.address, str):
+            os.makedirs(os.path.dirname(self.address), exist_ok=True)
+            if os.path.exists(self.address):
+                os.remove(self.address)             # stale socket of a killed daemon
+        with Listener(self.address, authkey=daemon_authkey(create=True)) as listener:
+            while True:
+                with listener.accept() as connection:
+                    while True:
+                        try:
+                            request = receive_message(connection)
+                        except (EOFError, ConnectionError):
+                            break
+                        if request.get("op") == "shutdown":
+                            send_message(connection, {"status": "ok"})
+                            return None
+                        segments = []
+                        try:
+                            response = dict(self.handle(request), status="ok")
+                            if request.get("op") == "build":
+                                segments = [handle["name"] for handle in response["parts"].values()]
+                        except Exception as e:
+                            response = {"status": "error", "error": f"{type(e).__name__}: {e}",
+                                        "traceback": traceback.format_exc()}
+                        try:
+                            self._respond(connection, response, segments)
+                        except (OSError, ConnectionError):
+                            break                   # client gone before its response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm build daemon for the parametric box parts.")
+    parser.add_argument("command", choices=["serve", "stop", "ping"])
+    parser.add_argument("--warm", metavar="PARAMETERS", help="parameter file whose parts are built at start up")
+    parser.add_argument("--max-boxes", type=int, default=16, help="warm boxes kept by the daemon")
+    args = parser.parse_args(argv)
+
+    match args.command:
+        case "serve":
+            daemon = build_daemon(max_boxes=args.max_boxes)
+            if args.warm:
+                daemon.warm(pc.load_parameter_file(args.warm))
+            print(f"build daemon {os.getpid()} listening on {daemon.address}", flush=True)
+            daemon.serve()
+        case "stop":
+            with daemon_client() as daemon:
+                daemon.shutdown()
+        case "ping":
+            with daemon_client() as daemon:
+                print(daemon.ping())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+# GM328A Case - vectorized feasibility of parametric_box parameter sets
+#
+# Derived dimensions and geometric rules computed with NumPy from the
+# parameters only, to filter large sweeps before any OCCT work:
+#
+#   result = box_dimensions({"class": "gm328A_case", "flange_height_top": np.linspace(2, 8, 100)})
+#   result["feasible"], result["violations"], result["wall_body_height"]
+import build123d as bd
+import inspect
+import numpy as np
+import parametric_case as pc
+
+
+def _parameter_columns(columns):
+    # (box_parameters name -> value, number of parameter sets); class defaults for the missing parameters.
+    # Values are float arrays, scalar or (n,), vectors as a tuple of 3 coordinates: constant values stay
+    # scalars, so only the varying parameters cost n operations
+    columns = dict(columns)
+    cls = pc.box_class(columns.pop("class", "parametric_box"))
+    signature = inspect.signature(pc.box_parameters).parameters
+    values = {name: columns.pop(name, cls.defaults.get(name, signature[name].default)) for name in pc.box_parameters.names()}
+    missing = [name for name, value in values.items() if value is inspect.Parameter.empty]
+    if missing:
+        raise ValueError(f"Missing box parameters ({', '.join(missing)})")
+
+    p = {}
+    for name, value in values.items():
+        if name in pc.box_parameters.vectors:
+            value = np.asarray([value.X, value.Y, value.Z] if isinstance(value, bd.Vector) else value, dtype=float)
+            p[name] = [np.round(value[..., axis], 9) for axis in range(3)]  # canonical values, as box_parameters
+        else:
+            p[name] = np.round(np.asarray(value, dtype=float), 9)
+    for key, value in columns.items():
+        name, _, axis = key.partition(".")
+        if name not in pc.box_parameters.vectors or axis not in ("X", "Y", "Z"):
+            raise ValueError(f"Unknown box parameter ({key})")
+        p[name]["XYZ".index(axis)] = np.round(np.asarray(value, dtype=float), 9)
+
+    shape = np.broadcast_shapes(*(np.shape(value) for values in p.values()
+                                  for value in (values if isinstance(values, list) else [values])))
+    return p, (shape[0] if shape else 1)
+
+
+def box_dimensions(columns):
+    """
+    Derived dimensions and feasibility of many parameter sets at once, computed
+    with NumPy from the parameters only (no geometry is built), to filter large
+    sweeps before any OCCT work.
+
+    The dimensions follow the part methods of parametric_box: heights and
+    z-levels of the layer stack, flange rings, snaps and fillet paths. A
+    parameter set is feasible when it passes the parametric_box.__init__
+    validation and the geometric rules below (the name of each rule is a key
+    of "violations"):
+        top_edge_thicker_than_lid, bottom_edge_thicker_than_base: the edge layer
+            leaves no room for the second layer of the lid/base.
+        wall_body_height: negative (or zero) wall body in wall_solid.
+        corners_too_large: corner fillet/chamfer larger than half a side (lid,
+            base or wall sketch).
+        wall_thicker_than_box: no opening left inside the wall.
+        top_flange_degenerate, bottom_flange_degenerate: the flange width leaves
+            no opening inside the flange ring.
+        top_flange_wider_than_wall, bottom_flange_wider_than_wall: the flange
+            ring does not fit in the wall opening.
+        flanges_overlap: lid and base flanges overlap in height.
+        snap_top_too_large, snap_bottom_too_large: the snap notch cuts through
+            the flange (deeper than the flange width).
+        snap_top_outside_wall, snap_bottom_outside_wall: the snap bump that
+            wall_solid adds at the height of the flange notch is not (fully)
+            on the wall, e.g. a lid flange reaching below the wall.
+
+    Parameters:
+    columns (dict): box_parameters name -> array with one value per parameter
+                    set ((n, 3) for vectors) or a single value for all; "name.X"
+                    (.Y, .Z) sets one coordinate of a vector; "class" is the box
+                    class name (default parametric_box), whose defaults apply to
+                    the missing parameters.
+
+    Returns:
+    dict: name -> array of n values: height, wall_z_min, wall_z_max,
+    wall_body_height, top_flange_z / bottom_flange_z ((n, 2): bottom and top),
+    top_flange_size / bottom_flange_size ((n, 2): outer X and Y of the ring),
+    snap_top_z / snap_bottom_z (center of the snaps), snap_top_size /
+    snap_bottom_size ((n, 3): length, height, depth), fillet_path_top /
+    fillet_path_bottom ((n, 2): X and Y of the sweep path), fillet_z_top /
+    fillet_z_bottom (profile position), feasible (bool); plus violations
+    (rule name -> bool array, True where the rule is violated).
+    """
+    p, n = _parameter_columns(columns)
+    dim_top, dim_bottom, dim_wall, clearance = p["dim_top"], p["dim_bottom"], p["dim_wall"], p["clearance"]
+    edge_top, edge_bottom = p["edge_top"], p["edge_bottom"]
+    base_type, corners_type, corners_size = p["base_type"], p["corners_type"], p["corners_size"]
+    flange_width = p["flange_width_top"]
+    detachable = base_type == 1
+    violations = {}
+
+    # parametric_box.__init__ validation
+    violations["edge_below_clearance"] = edge_top[2] < clearance[2]
+    violations["independent_fillet_on_fused_base"] = ~detachable & ((p["fillet_type_bottom"] == 2) |
+                                                                    (p["fillet_type_bottom"] == 4))
+    violations["edge_bottom_on_fused_base"] = (base_type == 0) & ((edge_bottom[0] != 0) | (edge_bottom[1] != 0) |
+                                                                  (edge_bottom[2] != 0))
+    violations["top_bottom_size_mismatch"] = (dim_top[0] != dim_bottom[0]) | (dim_top[1] != dim_bottom[1])
+
+    # layer stack (top_solid, bottom_solid, wall_solid with wider top and bottom)
+    height = dim_bottom[2] + dim_wall[2] + dim_top[2] + 2*clearance[2]
+    wall_body_height = height - 2*(1 + 2 + 0.5)*dim_bottom[2] - 2*clearance[2]
+    wall_z_min = dim_bottom[2] + clearance[2]
+    wall_z_max = wall_z_min + (2 + 0.5)*dim_bottom[2] + wall_body_height + (0.5 + 2)*dim_top[2]
+    violations["top_edge_thicker_than_lid"] = dim_top[2] <= edge_top[2] - clearance[2]
+    violations["bottom_edge_thicker_than_base"] = detachable & (dim_bottom[2] <= edge_bottom[2] - clearance[2])
+    violations["wall_body_height"] = wall_body_height <= 1e-9
+
+    # lid and base sketches (_top_sketch, _bottom_sketch; the base follows fillet_type_top, as in _bottom_sketch)
+    independent = (p["fillet_type_top"] == 2) | (p["fillet_type_top"] == 4)
+    top_size = [np.where(independent, dim_top[axis] - 2*(p["fillet_dim_top"][axis] + clearance[axis]), dim_top[axis])
+                for axis in (0, 1)]
+    bottom_size = [np.where(independent & detachable,
+                            dim_bottom[axis] - 2*(p["fillet_dim_bottom"][axis] + clearance[axis]), dim_bottom[axis])
+                   for axis in (0, 1)]
+    corner = np.where(corners_type == 0, 0, corners_size)
+    violations["corners_too_large"] = (2*corner >= np.minimum(*top_size)) | (2*corner >= np.minimum(*bottom_size)) | \
+        ((corners_type != 0) & (2*(corners_size + dim_wall[0]) >= np.minimum(dim_bottom[0], dim_bottom[1])))
+
+    # wall opening at the lid/base interfaces (_wall_sketch)
+    opening = [dim_bottom[axis] - 2*(dim_wall[0] + edge_top[0]) for axis in (0, 1)]
+    violations["wall_thicker_than_box"] = (opening[0] <= 0) | (opening[1] <= 0)
+
+    # flange rings (_top_flange_sketch, _bottom_flange_sketch: both use edge_top and flange_width_top)
+    results = {}
+    for side, size, present, flange_height, z_min in (
+            ("top", top_size, True, p["flange_height_top"],
+             height - dim_top[2] + clearance[2] - p["flange_height_top"]),
+            ("bottom", bottom_size, detachable, p["flange_height_bottom"], dim_bottom[2] - clearance[2])):
+        outer = [size[axis] - 2*edge_top[0] for axis in (0, 1)]
+        z_max = z_min + flange_height
+        violations[f"{side}_flange_degenerate"] = present & ((outer[0] <= 2*flange_width) | (outer[1] <= 2*flange_width))
+        violations[f"{side}_flange_wider_than_wall"] = present & ((outer[0] > opening[0] + 1e-9) |
+                                                                  (outer[1] > opening[1] + 1e-9))
+
+        # snaps (_snap_*_sketch/_snap_*_solid): a notch in the flange (_*_flange_solid) and the
+        # matching bump on the inside of the wall (wall_solid, whatever the base type), at the same
+        # height: flange_height/8 from the lid flange bottom, from the base flange top
+        snap = p[f"snap_{side}"]
+        dim = dim_top if side == "top" else dim_bottom
+        length = np.where((snap == 1) & (dim[0] < dim[1]), dim[0], dim[1])/2
+        snap_height, snap_depth = flange_height/4, flange_height/8
+        snap_z = z_min + snap_depth if side == "top" else z_max - snap_depth
+        violations[f"snap_{side}_too_large"] = present & (snap != 0) & (snap_depth >= flange_width)
+        violations[f"snap_{side}_outside_wall"] = (snap != 0) & ((snap_z - snap_height/2 < wall_z_min - 1e-9) |
+                                                                 (snap_z + snap_height/2 > wall_z_max + 1e-9))
+        results[f"{side}_flange_z"] = (z_min, z_max)
+        results[f"{side}_flange_size"] = outer
+        results[f"snap_{side}_z"] = snap_z
+        results[f"snap_{side}_size"] = (length, snap_height, snap_depth)
+    violations["flanges_overlap"] = detachable & (results["top_flange_z"][0] < results["bottom_flange_z"][1])
+
+    # fillet sweep paths (fillet_engine.path: sketch offset by clearance.X) and profile positions (type 1)
+    results["fillet_path_top"] = [top_size[axis] + 2*clearance[0] for axis in (0, 1)]
+    results["fillet_path_bottom"] = [bottom_size[axis] + 2*clearance[0] for axis in (0, 1)]
+    results["fillet_z_top"] = height - dim_top[2]/2
+    results["fillet_z_bottom"] = dim_bottom[2]/2
+    results.update(height=height, wall_z_min=wall_z_min, wall_z_max=wall_z_max, wall_body_height=wall_body_height)
+
+    # one value per parameter set (constant parameters were computed once)
+    for name, value in results.items():
+        results[name] = np.stack(np.broadcast_arrays(*value, np.empty(n))[:-1], axis=1) \
+            if isinstance(value, (tuple, list)) else np.broadcast_to(value, (n,))
+    violations = {rule: np.broadcast_to(mask, (n,)) for rule, mask in violations.items()}
+    infeasible = np.zeros(n, dtype=bool)
+    np.logical_or.reduce(list(violations.values()), out=infeasible, axis=0)
+    return dict(results, feasible=~infeasible, violations=violations)
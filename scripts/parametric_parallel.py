@@ -0,0 +1,649 @@
+# GM328A Case - parallel builds of parametric_box parts
+#
+# Part methods do not depend on each other, so every (box, part) pair can be
+# built in its own worker process. Workers ship the solids (and optionally
+# their meshes) back through shared memory; build_parts runs a batch of jobs,
+# async_builder cancellable builds for an editor and worker_pool long sweeps
+# with memory bounded, killable workers.
+#
+#   parts = build_parts({"case": gm328A_case(), "battery": gm328A_battery()})
+import build123d as bd
+import asyncio
+import concurrent.futures
+import contextvars
+import gc
+import io
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import queue
+import resource
+import secrets
+import sys
+import threading
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from OCP.BinTools import BinTools
+from OCP.TopoDS import TopoDS_Shape
+import parametric_case as pc
+import parametric_profiling as prof
+
+
+#*******************
+# SHARED MEMORY TRANSPORT
+#*******************
+def shape_to_binary(shape):
+    """
+    Serialize a Shape into a binary BREP (bytes), smaller and faster to write
+    and read than the text BREP of parametric_case.shape_to_brep.
+    """
+    buffer = io.BytesIO()
+    BinTools.Write_s(shape.wrapped, buffer)
+    return buffer.getvalue()
+
+
+def binary_to_part(data):
+    """
+    Rebuild a Part from a binary BREP (bytes or any buffer, e.g. a memoryview).
+    """
+    shape = TopoDS_Shape()
+    # the OCP binding reads the whole stream as bytes into a C++ stream: one
+    # copy is unavoidable (BytesIO.read returns its buffer, without another one)
+    BinTools.Read_s(shape, io.BytesIO(data))
+    return bd.Part(shape)
+
+
+def mesh_arrays(solid, tolerance=1e-3, angular_tolerance=0.1):
+    """
+    Tessellate a solid (same defaults as bd.export_stl).
+
+    Returns:
+    tuple: (vertices, triangles) - float32 array (n, 3) and uint32 array (m, 3).
+    """
+    vertices, triangles = solid.tessellate(tolerance, angular_tolerance)
+    return (np.array([(v.X, v.Y, v.Z) for v in vertices], dtype=np.float32).reshape(-1, 3),
+            np.array(triangles, dtype=np.uint32).reshape(-1, 3))
+
+
+class shared_mesh():
+    """
+    Mesh of a part received through shared memory: vertices and triangles are
+    NumPy views on the segment written by the worker, no copy is made.
+
+    The segment name is released on reception, the memory itself when the mesh
+    is closed (or garbage collected). Copy the arrays that must outlive it.
+    """
+    def __init__(self, vertices, triangles, shm=None):
+        # instance properties
+        self.vertices = vertices
+        self.triangles = triangles
+        self._shm = shm
+        return None
+
+    def close(self):
+        self.vertices = self.triangles = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def share_part(solid, mesh=None):
+    """
+    Copy a part (binary BREP and optionally its mesh) into a new shared memory
+    segment, on the worker side of a process pool.
+
+    Parameters:
+    solid (Part): the part.
+    mesh (tuple): None, or (tolerance, angular_tolerance) to add the mesh arrays.
+
+    Returns:
+    dict: small picklable handle for receive_part (segment name and layout).
+    """
+    data = shape_to_binary(solid)
+    arrays = list(mesh_arrays(solid, *mesh)) if mesh is not None else []
+    # layout: BREP, then each array on an 8 bytes boundary
+    layout, size = [], len(data)
+    for array in arrays:
+        size = (size + 7) // 8 * 8
+        layout.append((size, array.dtype.str, array.shape))
+        size += array.nbytes
+    name = f"psm_{secrets.token_hex(8)}"
+    connection = _POOL_CONNECTION.get()
+    if connection is not None:
+        # announced before it exists: the parent unlinks it if this worker is killed
+        connection.send(("segment", name))
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+    try:
+        shm.buf[:len(data)] = data
+        for (offset, _, _), array in zip(layout, arrays):
+            shm.buf[offset:offset + array.nbytes] = array.tobytes()
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return {"name": shm.name, "size": len(data), "arrays": layout}
+
+
+def receive_part(handle):
+    """
+    Rebuild a part shipped by share_part, in the calling process.
+
+    Returns:
+    tuple: (Part, shared_mesh or None).
+    """
+    shm = shared_memory.SharedMemory(name=handle["name"])
+    shm.unlink()                                    # mapped memory stays valid until closed
+    mesh = None
+    try:
+        with shm.buf[:handle["size"]] as data:
+            part = binary_to_part(data)
+        if handle["arrays"]:
+            vertices, triangles = [np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                                   for offset, dtype, shape in handle["arrays"]]
+            mesh = shared_mesh(vertices, triangles, shm)
+    finally:
+        if mesh is None:
+            shm.close()                             # else the mesh keeps the segment mapped
+    return part, mesh
+
+
+def unlink_segment(name):
+    """
+    Unlink the shared memory segment of a part that will not be received
+    (see share_part), if it still exists.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return None                                 # never created, or already received
+    shm.close()
+    shm.unlink()
+    return None
+
+
+def _build_part(box, part, trace=False, mesh=None):
+    # runs in the worker process
+    if trace:
+        (handle, seconds), events = prof.run_traced(_build_part, box, part, mesh=mesh)
+        return handle, seconds, events
+    start = time.perf_counter()
+    solid = getattr(box, part)()
+    return share_part(solid, mesh), time.perf_counter() - start
+
+
+def build_parts(boxes, parts=None, max_workers=None, timings=None, trace=None, meshes=None,
+                mesh_tolerance=(1e-3, 0.1)):
+    """
+    Build the parts of one or more boxes in a process pool.
+
+    Parts do not depend on each other, so every (box, part) pair is an
+    independent job. Workers write the solids as binary BREP into shared
+    memory (see share_part) and the parts are rebuilt in the calling process.
+
+    Parameters:
+    boxes (dict): name -> parametric_box (or subclass) instance.
+    parts (list): part method names to build (default: box.part_names for each box).
+    max_workers (int): number of worker processes (default: number of cores);
+                       1 builds in the calling process.
+    timings (dict): optional, filled with (name, part) -> build time in seconds.
+    trace (build_trace): optional, receives the spans of the jobs and of the
+                         builds done in the workers (see
+                         parametric_profiling.build_trace).
+    meshes (dict): optional, filled with (name, part) -> shared_mesh; the parts
+                   are also tessellated (in the workers) with mesh_tolerance,
+                   (tolerance, angular_tolerance).
+
+    Returns:
+    dict: name -> {part name -> Part}.
+    """
+    jobs = [(name, part) for name, box in boxes.items() for part in (parts or box.part_names)]
+    results = {name: {} for name in boxes}
+
+    if max_workers == 1:
+        for name, part in jobs:
+            start = time.perf_counter()
+            if trace is not None:
+                with trace:
+                    results[name][part] = getattr(boxes[name], part)()
+                trace.span(f"{name}.{part}", "job", start * 1e6, trace.now())
+            else:
+                results[name][part] = getattr(boxes[name], part)()
+            if meshes is not None:
+                meshes[(name, part)] = shared_mesh(*mesh_arrays(results[name][part], *mesh_tolerance))
+            if timings is not None:
+                timings[(name, part)] = time.perf_counter() - start
+        return results
+
+    # the segments outlive the workers that create them: share this process' tracker
+    resource_tracker.ensure_running()
+    mesh = mesh_tolerance if meshes is not None else None
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        submitted = time.perf_counter() * 1e6
+        futures = {pool.submit(_build_part, boxes[name], part, trace is not None, mesh): (name, part)
+                   for name, part in jobs}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                name, part = futures[future]
+                handle, seconds, *events = future.result()
+                results[name][part], shared = receive_part(handle)
+                if meshes is not None:
+                    meshes[(name, part)] = shared
+                if timings is not None:
+                    timings[(name, part)] = seconds
+                if trace is not None:
+                    # queued + built + shipped, as seen from the calling process
+                    trace.span(f"{name}.{part}", "job", submitted, trace.now())
+                    trace.events.extend(events[0])
+        except BaseException:
+            # the parts of the other jobs will not be received: drain them and unlink their segments
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+            for future in futures:
+                if not future.cancelled() and future.exception() is None:
+                    unlink_segment(future.result()[0]["name"])
+            raise
+    return results
+
+
+#*******************
+# ASYNC BUILDS
+#*******************
+def _async_worker(connection):
+    # async_builder worker process: build jobs until a None job
+    _POOL_CONNECTION.set(connection)
+    boxes = {}
+    while True:
+        job = connection.recv()
+        if job is None:
+            return None
+        name, box, part, mesh = job
+        # successive versions of a named box share their unchanged features
+        key = (type(box).__name__, name)
+        if key in boxes:
+            box.reuse_features(boxes[key])
+        boxes[key] = box
+        start = time.perf_counter()
+        try:
+            result = ("ok", share_part(getattr(box, part)(), mesh), time.perf_counter() - start)
+        except Exception as e:                      # OCCT exceptions do not always pickle
+            result = ("error", f"{type(e).__name__}: {e}", None)
+        connection.send(result)
+
+
+def _discard_part(handle):
+    # release the shared memory of a part nobody is waiting for anymore
+    _, shared = receive_part(handle)
+    if shared is not None:
+        shared.close()
+    return None
+
+
+class _worker_process():
+    # a worker process (async_builder, worker_pool) running target(connection, *args) and our end of the pipe
+    def __init__(self, context, target, *args):
+        # instance properties
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=target, args=(child,) + args, daemon=True)
+        self.process.start()
+        child.close()
+        self.segments = []                          # shared memory announced by the running job (see share_part)
+        return None
+
+    def receive(self, timeout=None):
+        # next message of the worker, segment announcements aside; EOFError when
+        # it died (the pipe may never report EOF, forked siblings inherit copies of its ends)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready = multiprocessing.connection.wait([self.connection, self.process.sentinel], remaining)
+            if not ready:
+                raise TimeoutError
+            if self.connection not in ready:
+                raise EOFError
+            message = self.connection.recv()
+            if message[0] != "segment":
+                return message
+            self.segments.append(message[1])
+
+    def release(self):
+        # unlink the shared memory of an abandoned job (worker killed or dead, job failed)
+        try:
+            while self.connection.poll():
+                message = self.connection.recv()
+                if message[0] == "segment":
+                    self.segments.append(message[1])
+        except (EOFError, OSError):
+            pass
+        for name in self.segments:
+            unlink_segment(name)                    # unless never created, or already received
+        self.segments = []
+        return None
+
+    def close(self):
+        self.connection.send(None)
+        self.process.join()
+        self.connection.close()
+        return None
+
+    def kill(self, reader):
+        # kill a busy worker; its pipe is closed once the reader thread returns
+        self.process.kill()
+
+        def discard(future):
+            self.release()                          # including a part shipped before the kill
+            self.connection.close()
+            self.process.join()
+        reader.add_done_callback(discard)
+        return None
+
+
+class async_builder():
+    """
+    Asyncio API to build box parts in warm worker processes, with cancellation.
+
+    Jobs run in a set of long lived worker processes (at most max_workers
+    busy at once). Cancelling a build (task.cancel(), or a newer build with the
+    same key) kills the workers still running its jobs and replaces them, so
+    stale builds stop using CPU right away. Each worker keeps the last version
+    of every named box, so a rebuild after a parameter edit only recomputes the
+    invalidated features (when it lands on the same worker).
+
+        builder = async_builder(max_workers=2)
+
+        async def on_edit(case):
+            # supersedes the previous "editor" build, if still running
+            parts = await builder.build_parts({"case": case}, parts=["top_solid"], key="editor")
+    """
+    def __init__(self, max_workers=None, context=None):
+        # instance properties
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.killed = 0                             # workers killed by cancellations
+        self._context = multiprocessing.get_context(context)
+        self._idle = []
+        self._slots = None                          # semaphore, bound to the running loop
+        self._readers = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+        self._latest = {}                           # key -> task of the latest build
+        return None
+
+    async def _job(self, name, box, part, mesh):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        async with self._slots:
+            if not self._idle:
+                resource_tracker.ensure_running()   # see build_parts
+            worker = self._idle.pop() if self._idle else _worker_process(self._context, _async_worker)
+            worker.connection.send((name, box, part, mesh))
+            reader = self._readers.submit(worker.receive)
+            try:
+                status, result, seconds = await asyncio.wrap_future(reader)
+                worker.segments = []                # handed over with the result
+            except asyncio.CancelledError:
+                worker.kill(reader)
+                self.killed += 1
+                raise
+            except EOFError:
+                worker.kill(reader)
+                raise RuntimeError(f"Worker process died building {name}.{part}") from None
+            self._idle.append(worker)
+        if status != "ok":
+            raise RuntimeError(f"{name}.{part}: {result}")
+        return result, seconds
+
+    async def build_parts(self, boxes, parts=None, key=None, timings=None, meshes=None,
+                          mesh_tolerance=(1e-3, 0.1)):
+        """
+        Build the parts of one or more boxes in the worker processes.
+
+        Parameters:
+        boxes (dict): name -> parametric_box (or subclass) instance.
+        parts (list): part method names (default: box.part_names for each box).
+        key (hashable): optional; a build with the same key as a running one
+                        cancels it (the superseded call raises
+                        asyncio.CancelledError).
+        timings, meshes, mesh_tolerance: see build_parts.
+
+        Returns:
+        dict: name -> {part name -> Part}.
+        """
+        build = asyncio.ensure_future(self._build(boxes, parts, timings, meshes, mesh_tolerance))
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None and not previous.done():
+                previous.cancel()
+            self._latest[key] = build
+        return await build
+
+    async def _build(self, boxes, parts, timings, meshes, mesh_tolerance):
+        mesh = mesh_tolerance if meshes is not None else None
+        jobs = {}
+        try:
+            async with asyncio.TaskGroup() as group:
+                for name, box in boxes.items():
+                    for part in (parts or box.part_names):
+                        jobs[(name, part)] = group.create_task(self._job(name, box, part, mesh))
+        except BaseException:
+            # cancelled or failed: the jobs that did finish shipped their parts
+            for job in jobs.values():
+                if job.done() and not job.cancelled() and job.exception() is None:
+                    _discard_part(job.result()[0])
+            raise
+        results = {name: {} for name in boxes}
+        for (name, part), job in jobs.items():
+            handle, seconds = job.result()
+            results[name][part], shared = receive_part(handle)
+            if meshes is not None:
+                meshes[(name, part)] = shared
+            if timings is not None:
+                timings[(name, part)] = seconds
+        return results
+
+    def close(self):
+        for worker in self._idle:
+            worker.close()
+        self._idle = []
+        self._readers.shutdown()
+        return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+        return False
+
+
+#*******************
+# MEMORY BOUNDED WORKERS
+#*******************
+def memory_usage():
+    """
+    Resident set size of this process and its peak since the last
+    reset_peak_memory (or since the start), in KB.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+    except (OSError, KeyError):
+        # no procfs: only the peak since the start is known (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak // 1024 if sys.platform == "darwin" else peak
+        return peak, peak
+
+
+def reset_peak_memory():
+    # restart the peak of memory_usage at the current RSS (Linux only, no-op elsewhere)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    return None
+
+
+# pipe to the parent, in the worker processes of worker_pool and async_builder (see job_step, share_part)
+_POOL_CONNECTION = contextvars.ContextVar("pool_connection", default=None)
+
+
+def job_step(label):
+    """
+    Mark the start of a step of a worker_pool job (e.g. one part of a variant):
+    the time budget of the pool applies to each step. No-op outside of the
+    pool workers.
+    """
+    connection = _POOL_CONNECTION.get()
+    if connection is not None:
+        connection.send(("step", label))
+    return None
+
+
+def _pool_worker(connection, max_rss=None):
+    # worker_pool worker process: run jobs until a None job, reporting the RSS left after each one
+    _POOL_CONNECTION.set(connection)
+    while True:
+        job = connection.recv()
+        if job is None:
+            return None
+        function, args, kwargs = job
+        try:
+            result = ("ok", function(*args, **kwargs))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:                       # OCCT exceptions do not always pickle
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            result = ("error", e)
+        # drop every reference to the job geometry before measuring
+        del job, function, args, kwargs
+        gc.collect()
+        rss = memory_usage()[0]
+        if max_rss and rss > max_rss:
+            # the (bounded) fillet engine is kept warm across jobs, unless the worker is over its cap
+            pc.FILLET_ENGINE.clear()
+            gc.collect()
+            rss = memory_usage()[0]
+        connection.send(result + (rss,))
+        del result
+
+
+class worker_pool():
+    """
+    Process pool whose workers are recycled after max_tasks jobs or when their
+    RSS (measured after each job, once its geometry is released) exceeds
+    max_rss KB. OCCT keeps memory after large booleans, so long sweeps in
+    long lived workers grow until the machine swaps; replacing the worker gives
+    the memory back to the system. The fillet engine cache of a worker is kept
+    across jobs, it is only dropped (before measuring again) when the worker is
+    over max_rss.
+
+    With a budget (seconds), a job step (see job_step; the whole job when it
+    has no steps) running longer than the budget is aborted: OCCT operations
+    cannot be interrupted, so the worker is killed and replaced, and the job
+    fails with a TimeoutError. A worker that dies (OOM killer, crash in OCCT)
+    fails its job with a RuntimeError; both errors have a step attribute.
+
+    submit() returns concurrent.futures.Future objects, so the pool can be used
+    with concurrent.futures.wait / as_completed like a ProcessPoolExecutor.
+
+        with worker_pool(max_workers=4, max_tasks=20, max_rss=2*1024*1024) as pool:
+            futures = [pool.submit(build_variant, parameters) for parameters in variants]
+    """
+    def __init__(self, max_workers=None, max_tasks=None, max_rss=None, budget=None, context=None):
+        # instance properties
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss                      # KB
+        self.budget = budget                        # seconds per job step
+        self.recycled = 0                           # workers replaced because of max_tasks/max_rss
+        self._context = multiprocessing.get_context(context)
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        resource_tracker.ensure_running()           # see build_parts
+        self._threads = [threading.Thread(target=self._manage, daemon=True) for _ in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+        return None
+
+    def submit(self, function, *args, **kwargs):
+        future = concurrent.futures.Future()
+        self._jobs.put((future, function, args, kwargs))
+        return future
+
+    def _manage(self):
+        # one thread per worker slot: feed the worker, recycle it when needed
+        worker, tasks = None, 0
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, function, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if worker is None:
+                worker, tasks = _worker_process(self._context, _pool_worker, self.max_rss), 0
+            step = function.__name__
+            try:
+                worker.connection.send((function, args, kwargs))
+                message = worker.receive(self.budget)
+                while message[0] == "step":         # the budget restarts with each step
+                    step = message[1]
+                    message = worker.receive(self.budget)
+                status, result, rss = message
+            except TimeoutError:
+                worker.process.kill()
+                error = TimeoutError(f"{step} exceeded its {self.budget}s budget")
+            except (EOFError, OSError):
+                # killed (e.g. by the OOM killer) or crashed in OCCT
+                error = RuntimeError(f"Worker process died running {step}")
+            else:
+                error = None
+            if error is not None:
+                error.step = step
+                worker.process.join()
+                worker.release()
+                worker.connection.close()
+                worker = None
+                future.set_exception(error)
+                continue
+            tasks += 1
+            if status == "ok":
+                worker.segments = []                # handed over with the result
+                future.set_result(result)
+            else:
+                worker.release()
+                future.set_exception(result)
+            if (self.max_tasks and tasks >= self.max_tasks) or (self.max_rss and rss > self.max_rss):
+                worker.close()
+                worker = None
+                with self._lock:
+                    self.recycled += 1
+        if worker is not None:
+            worker.close()
+        return None
+
+    def shutdown(self, wait=True):
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
@@ -0,0 +1,298 @@
+# GM328A Case - geometry profiling and build traces
+#
+# geometry_profiler counts and times the build123d operations called by the
+# parametric_case model code; build_trace records a build as a trace-event
+# timeline (Perfetto, chrome://tracing).
+#
+#   with geometry_profiler() as profiler:
+#       box.wall_solid()
+#   print(profiler.report())
+import build123d as bd
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import parametric_case as pc
+
+
+#*******************
+# INSTRUMENTATION
+#*******************
+# profilers active in this context (thread); empty inside a recorded operation
+_ACTIVE_PROFILERS = contextvars.ContextVar("active_profilers", default=())
+_PATCH_LOCK = threading.Lock()
+_PATCHES = {"users": 0, "originals": []}
+
+
+class geometry_profiler():
+    """
+    Count and time the build123d operations called by the model code.
+
+    While active (as a context manager), the build123d operations used by the
+    part methods (extrude, loft, sweep, fillet, chamfer, offset, split, mirror)
+    and the booleans (+ / +=, - / -=) are wrapped. Every call is recorded under
+    the box method that made it (e.g. parametric_box.wall_solid) and its line,
+    with the elapsed time and the face count of the input and output shapes.
+    Calls made through a helper (module functions such as cut_tools, the
+    fillet engine, component methods) are recorded under the box method that
+    called the helper, the helper is reported with them ("via"). Operations
+    called from inside another wrapped operation are part of the outer one.
+    The wrappers are installed while any profiler is active but only record
+    the calls of the threads that entered a profiler, so concurrent builds
+    can be profiled separately (one profiler per thread).
+
+        with geometry_profiler() as profiler:
+            box.wall_solid()
+        print(profiler.report())
+    """
+    operations = ("extrude", "loft", "sweep", "fillet", "chamfer", "offset", "split", "mirror")
+    booleans = ((bd.Shape, "__add__", "fuse"), (bd.Shape, "__sub__", "cut"),
+                (bd.Compound, "__add__", "fuse"), (bd.Compound, "__sub__", "cut"),
+                (bd.Curve, "__add__", "fuse"))
+
+    def __init__(self, disable_cache=True):
+        # instance properties
+        self.disable_cache = disable_cache          # cached parts would hide the operations
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._tokens = []
+        return None
+
+    def __enter__(self):
+        with _PATCH_LOCK:
+            if _PATCHES["users"] == 0:
+                for name in self.operations:
+                    _patch_operation(bd, name, name)
+                for cls, name, operation in self.booleans:
+                    _patch_operation(cls, name, operation)
+            _PATCHES["users"] += 1
+        bypass = pc.part_cache_bypass() if self.disable_cache else None
+        if bypass is not None:
+            bypass.__enter__()
+        self._tokens.append((_ACTIVE_PROFILERS.set(_ACTIVE_PROFILERS.get() + (self,)), bypass))
+        return self
+
+    def __exit__(self, *exc):
+        profilers, bypass = self._tokens.pop()
+        _ACTIVE_PROFILERS.reset(profilers)
+        if bypass is not None:
+            bypass.__exit__(None, None, None)
+        with _PATCH_LOCK:
+            _PATCHES["users"] -= 1
+            if _PATCHES["users"] == 0:
+                for owner, name, original in reversed(_PATCHES["originals"]):
+                    setattr(owner, name, original)
+                _PATCHES["originals"] = []
+        return False
+
+    @staticmethod
+    def _faces(value):
+        if isinstance(value, bd.Shape):
+            return len(value.faces())
+        if isinstance(value, (list, tuple)):
+            return sum(geometry_profiler._faces(v) for v in value)
+        return 0
+
+    @staticmethod
+    def _owner(frame):
+        # (owner frame, helper name or None): the nearest method of a box running
+        # code of the model module, skipping helpers and decorator wrappers; the
+        # nearest model frame when no box method is on the stack
+        nearest = helper = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == pc.__file__ and "<" not in code.co_qualname:
+                if isinstance(frame.f_locals.get("self"), pc.parametric_box):
+                    return frame, helper
+                if nearest is None:
+                    nearest = helper = frame
+            frame = frame.f_back
+        return nearest, None
+
+    def _record(self, operation, start, elapsed, args, result, frame):
+        frame, helper = self._owner(frame)
+        if frame is None:
+            return None
+        caller = frame.f_code.co_qualname
+        via = helper.f_code.co_qualname if helper is not None else None
+        faces_in, faces_out = self._faces(args), self._faces(result)
+
+        with self._lock:
+            entry = self.calls.setdefault((caller, operation), {"count": 0, "time": 0.0, "faces_in": 0,
+                                                                 "faces_out": 0, "lines": {}, "via": {}})
+            entry["count"] += 1
+            entry["time"] += elapsed
+            entry["faces_in"] += faces_in
+            entry["faces_out"] += faces_out
+            entry["lines"][frame.f_lineno] = entry["lines"].get(frame.f_lineno, 0) + 1
+            if via is not None:
+                entry["via"][via] = entry["via"].get(via, 0) + 1
+        return caller, faces_in, faces_out
+
+    def stats(self):
+        """
+        Returns:
+        dict: calling method -> operation -> {count, time, faces_in, faces_out,
+        lines (line number -> count), via (helper -> count)}.
+        """
+        stats = {}
+        with self._lock:
+            for (caller, operation), entry in self.calls.items():
+                stats.setdefault(caller, {})[operation] = dict(entry, lines=dict(entry["lines"]),
+                                                               via=dict(entry["via"]))
+        return stats
+
+    def report(self):
+        """
+        Returns:
+        str: the operations per calling method, slowest methods first.
+        """
+        lines = []
+        stats = self.stats()
+        totals = {caller: sum(e["time"] for e in ops.values()) for caller, ops in stats.items()}
+        for caller in sorted(stats, key=totals.get, reverse=True):
+            lines.append(f"{caller:<52}{totals[caller]:>9.3f}s")
+            for operation, e in sorted(stats[caller].items(), key=lambda item: -item[1]["time"]):
+                sites = ", ".join(str(line) for line in sorted(e["lines"]))
+                via = "".join(f", via {helper} x{count}" for helper, count in sorted(e["via"].items()))
+                lines.append(f"    {operation:<10} x{e['count']:<5}{e['time']:>9.3f}s   "
+                             f"faces {e['faces_in']} -> {e['faces_out']}   (lines {sites}{via})")
+        return "\n".join(lines)
+
+
+def _patch_operation(owner, name, operation):
+    # wrap a build123d operation for the profilers of the calling context
+    original = vars(owner)[name]
+    _PATCHES["originals"].append((owner, name, original))
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        profilers = _ACTIVE_PROFILERS.get()
+        if not profilers:
+            return original(*args, **kwargs)
+        token = _ACTIVE_PROFILERS.set(())           # nested operations (and face counting) are not recorded
+        try:
+            start = time.perf_counter()
+            result = original(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            for profiler in profilers:
+                profiler._record(operation, start, elapsed, args, result, sys._getframe(1))
+        finally:
+            _ACTIVE_PROFILERS.reset(token)
+        return result
+    setattr(owner, name, wrapper)
+    return None
+
+
+#*******************
+# TRACING
+#*******************
+class build_trace(geometry_profiler):
+    """
+    Record a build as a trace-event timeline (Perfetto, chrome://tracing).
+
+    While active, the trace contains nested spans for the model methods
+    (e.g. gm328A_case.top_solid -> parametric_box._top_flange_solid ->
+    parametric_box._snap_top_solid), one span per geometry operation (see
+    geometry_profiler) and the part cache, feature memo and fillet engine hits
+    and misses. parametric_parallel.build_parts(..., trace=...) adds one span per job and merges
+    the events recorded by the worker processes, one track per process.
+
+        trace = build_trace()
+        parts = build_parts({"case": case, "battery": battery}, trace=trace)
+        trace.save("gm328a.trace.json")
+    """
+    # parametric_case code that is not part of the model
+    skip = ("part_cache.", "fillet_engine._store", "geometry_profiler.", "build_trace.")
+
+    def __init__(self, disable_cache=False):
+        super().__init__(disable_cache)
+        self.events = []
+        self._stack = []
+        self._profile = None
+        self._events_token = None
+        return None
+
+    def __enter__(self):
+        super().__enter__()
+        self._events_token = pc.CACHE_EVENTS.set(pc.CACHE_EVENTS.get() + (self._on_cache,))
+        self._profile = sys.getprofile()            # per thread
+        sys.setprofile(self._on_call)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(self._profile)
+        self._stack = []
+        pc.CACHE_EVENTS.reset(self._events_token)
+        return super().__exit__(*exc)
+
+    @staticmethod
+    def now():
+        # microseconds on a clock shared by all the processes of the machine
+        return time.perf_counter() * 1e6
+
+    def span(self, name, category, start, end, args=None, pid=None):
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": start, "dur": end - start,
+                            "pid": pid or os.getpid(), "tid": threading.get_native_id(), "args": args or {}})
+        return None
+
+    def instant(self, name, category, args=None):
+        self.events.append({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self.now(),
+                            "pid": os.getpid(), "tid": threading.get_native_id(), "args": args or {}})
+        return None
+
+    def _on_cache(self, cache, hit, key):
+        # parametric_case.CACHE_EVENTS callback: part cache, feature memo, fillet engine
+        self.instant(f"{cache} {'hit' if hit else 'miss'}", "cache", {"key": str(key)[:80]})
+        return None
+
+    def _on_call(self, frame, event, arg):
+        # sys.setprofile hook: spans for the functions and methods of parametric_case
+        code = frame.f_code
+        if code.co_filename != pc.__file__:
+            return None
+        if event == "call":
+            name = code.co_qualname
+            if "<" in name or name.startswith(self.skip) or name.rsplit(".", 1)[-1].startswith("__") or \
+               ("." not in name and name.startswith("_")):
+                return None
+            self._stack.append((frame, name, self.now()))
+        elif event == "return" and self._stack and self._stack[-1][0] is frame:
+            _, name, start = self._stack.pop()
+            self.span(name, "method", start, self.now())
+        return None
+
+    def _record(self, operation, start, elapsed, args, result, frame):
+        recorded = super()._record(operation, start, elapsed, args, result, frame)
+        if recorded is not None:
+            caller, faces_in, faces_out = recorded
+            self.span(operation, "geometry", start * 1e6, (start + elapsed) * 1e6,
+                      {"caller": caller, "faces_in": faces_in, "faces_out": faces_out})
+        return recorded
+
+    def save(self, path):
+        """
+        Write the trace as a JSON trace-event file.
+        """
+        main_pid = os.getpid()
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid,
+                     "args": {"name": "build" if pid == main_pid else f"worker {pid}"}}
+                    for pid in sorted({event["pid"] for event in self.events})]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f)
+        return None
+
+
+def run_traced(function, *args, **kwargs):
+    """
+    Call function(*args, **kwargs) inside a build_trace, e.g. in a worker process.
+
+    Returns:
+    tuple: (function result, list of trace events).
+    """
+    with build_trace() as trace:
+        result = function(*args, **kwargs)
+    return result, trace.events
@@ -0,0 +1,434 @@
+# GM328A Case - parameter sweeps over parametric_box variants
+#
+# Variants are plain (JSON like) parameter dicts, as used by
+# parametric_case.box_from_parameters, e.g.:
+#
+#   base = {"class": "gm328A_case", "dim_top": [85.1, 70.2, 2], ...}
+#   variants = grid(base, {"clearance.X": [0.1, 0.2, 0.3], "flange_height_top": [3, 4, 5]})
+#   for result in sweep(variants, parts=["top_solid"], output="fit_tests"):
+#       print(result["index"], result["status"], result["parts"])
+import concurrent.futures
+import copy
+import datetime
+import hashlib
+import inspect
+import itertools
+import json
+import multiprocessing.resource_tracker
+import os
+import random
+import time
+import numpy as np
+import parametric_case as pc
+import parametric_feasibility as pf
+import parametric_parallel as pp
+
+
+#*******************
+# VARIANT GENERATORS
+#*******************
+def set_parameter(parameters, name, value):
+    """
+    Set a parameter in a parameter dict; "name.X" (or .Y, .Z) sets a single
+    coordinate of a vector parameter (starting from the box_parameters default
+    when the dict does not have it).
+    """
+    if "." in name:
+        name, axis = name.split(".")
+        default = inspect.signature(pc.box_parameters).parameters[name].default
+        vector = list(parameters.get(name, default))
+        vector["XYZ".index(axis)] = value
+        value = vector
+    parameters[name] = value
+    return parameters
+
+
+def grid(base, axes):
+    """
+    Full factorial grid over some parameters.
+
+    Parameters:
+    base (dict): parameters shared by all variants.
+    axes (dict): parameter name -> list of values.
+
+    Returns:
+    generator: one parameter dict per grid point.
+    """
+    names = list(axes)
+    for values in itertools.product(*(axes[name] for name in names)):
+        parameters = copy.deepcopy(base)
+        for name, value in zip(names, values):
+            set_parameter(parameters, name, value)
+        yield parameters
+
+
+def random_sample(base, ranges, n, seed=None):
+    """
+    Random sample over some parameters.
+
+    Parameters:
+    base (dict): parameters shared by all variants.
+    ranges (dict): parameter name -> (low, high) for a uniform float or a list
+                   of values to choose from.
+    n (int): number of variants.
+    seed (int): random seed, for reproducible samples.
+
+    Returns:
+    generator: n parameter dicts.
+    """
+    rnd = random.Random(seed)
+    for _ in range(n):
+        parameters = copy.deepcopy(base)
+        for name, choices in ranges.items():
+            value = rnd.uniform(*choices) if isinstance(choices, tuple) else rnd.choice(choices)
+            set_parameter(parameters, name, value)
+        yield parameters
+
+
+def feasible_grid(base, axes):
+    """
+    Full factorial grid (see grid) without the points rejected by
+    parametric_feasibility.box_dimensions. The whole grid is checked at once with
+    NumPy, before any parameter dict is made, so grids of 100k points are
+    filtered in milliseconds.
+
+    Returns:
+    tuple: (generator of the parameter dicts of the feasible points, in grid
+    order; box_dimensions result for the whole grid).
+    """
+    names = list(axes)
+    indices = [index.ravel() for index in np.meshgrid(*(np.arange(len(axes[name])) for name in names), indexing="ij")]
+    columns = dict(base, **{name: np.asarray(axes[name], dtype=float)[index] for name, index in zip(names, indices)})
+    dimensions = pf.box_dimensions(columns)
+
+    def variants():
+        for point in np.flatnonzero(dimensions["feasible"]):
+            parameters = copy.deepcopy(base)
+            for name, index in zip(names, indices):
+                set_parameter(parameters, name, axes[name][index[point]])
+            yield parameters
+
+    return variants(), dimensions
+
+
+#*******************
+# FAILURE CACHE
+#*******************
+def _code_version():
+    # failures recorded with another version of the model code are retried
+    with open(pc.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class failure_cache():
+    """
+    Persistent record of the part builds that failed (OCCT error raised by
+    the part method, crashed worker or time budget exceeded), keyed by box
+    class, parameter digest and part, so that later sweeps requesting that
+    part skip the variant at once. Export failures are not recorded, they do
+    not depend on the geometry alone.
+
+    Entries are appended to a JSON lines file with the reason. Entries of
+    another version of parametric_case.py are ignored, and so are timeouts
+    when the current budget is larger than the one that expired (or
+    unlimited).
+    """
+    def __init__(self, path):
+        # instance properties
+        self.path = path
+        self._entries = None
+        self._code = _code_version()
+        return None
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self.path):
+                with open(self.path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:          # torn last line of an interrupted sweep
+                            continue
+                        if entry.get("code") == self._code:
+                            self._entries[(entry["class"], entry["digest"], entry["part"])] = entry
+        return self._entries
+
+    def get(self, cls, digest, parts, budget=None):
+        """
+        Parameters:
+        cls (str): box class name.
+        digest (str): box_parameters digest.
+        parts (list): the requested parts.
+        budget (float): current part budget (seconds, None: unlimited).
+
+        Returns:
+        dict: the failure recorded for the first of the parts that has one, for
+        a box class and parameter digest (part, kind, error, budget, date), or
+        None.
+        """
+        entries = self._load()
+        for part in parts:
+            entry = entries.get((cls, digest, part))
+            if entry is None or (entry["kind"] == "timeout" and (budget is None or budget > entry["budget"])):
+                continue
+            return entry
+        return None
+
+    def put(self, cls, digest, part, kind, error, budget=None):
+        entry = {"class": cls, "digest": digest, "part": part, "kind": kind, "error": error, "budget": budget,
+                 "code": self._code, "date": datetime.datetime.now().isoformat(timespec="seconds")}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._load()[(cls, digest, part)] = entry
+        return None
+
+    def clear(self):
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+        self._entries = None
+        return None
+
+
+FAILURE_CACHE = failure_cache(os.path.join(pc.PART_CACHE.directory, "failures.jsonl"))
+
+
+#*******************
+# JOURNAL
+#*******************
+class sweep_journal():
+    """
+    Append-only record of the completed variants of a sweep, so that an
+    interrupted sweep (reboot, Ctrl+C) resumes with the unfinished variants.
+
+    Each line holds the result of one variant: its key (index, parameters,
+    parts and formats), status, error, exported paths, timings and memory.
+    Lines are flushed to disk as they are written; a torn last line is ignored.
+    """
+    def __init__(self, path):
+        # instance properties
+        self.path = path
+        self._entries = None
+        return None
+
+    @staticmethod
+    def key(index, parameters, parts, formats):
+        # the same variant of the same sweep, exported to the same files
+        record = json.dumps([index, parameters, parts, list(formats)], sort_keys=True, default=list)
+        return hashlib.sha256(record.encode()).hexdigest()
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self.path):
+                with open(self.path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        self._entries[entry["key"]] = entry
+        return self._entries
+
+    def get(self, key):
+        """
+        Returns:
+        dict: the journaled result of a variant, or None when it has to be
+        (re)built: not completed, or one of its exported files is gone.
+        """
+        entry = self._load().get(key)
+        if entry is None or not all(os.path.isfile(path) for paths in entry["parts"].values() for path in paths):
+            return None
+        return entry
+
+    def put(self, key, result):
+        entry = {name: result.get(name) for name in ("index", "digest", "status", "error", "kind", "step",
+                                                      "parts", "timings", "memory")}
+        entry["key"] = key
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())                    # survive a reboot
+        self._load()[key] = entry
+        return None
+
+    def __len__(self):
+        return len(self._load())
+
+
+#*******************
+# SWEEP
+#*******************
+def _build_variant(parameters, parts, output, formats, prefix):
+    # runs in the worker process: build (and export) every requested part
+    result = {"parts": {}, "timings": {}, "memory": {}}
+    part, stage = None, "build"
+    try:
+        box = pc.box_from_parameters(parameters)
+        for part in (parts or box.part_names):
+            pp.job_step(part)                       # the part time budget starts here
+            pp.reset_peak_memory()
+            start = time.perf_counter()
+            stage = "build"
+            solid = getattr(box, part)()
+            stage = "export"
+            pp.job_step(f"{part} export")
+            if output is None:
+                result["parts"][part] = pp.share_part(solid)
+            else:
+                paths = [os.path.join(output, f"{prefix}_{part}.{fmt}") for fmt in formats]
+                for path in paths:
+                    pc.export_part(solid, path)
+                result["parts"][part] = paths
+            result["timings"][part] = time.perf_counter() - start
+            result["memory"][part] = pp.memory_usage()[1]
+            del solid
+        result["status"] = "ok"
+    except Exception as e:                          # OCCT failures for odd parameter sets
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["kind"] = "error" if stage == "build" else "export"
+        result["step"] = part
+    return result
+
+
+def _pool_result(future):
+    # result of _build_variant, or a failed result when the worker was killed (budget) or died
+    try:
+        return future.result()
+    except (TimeoutError, RuntimeError) as e:
+        return {"parts": {}, "timings": {}, "memory": {}, "status": "failed", "error": f"{type(e).__name__}: {e}",
+                "kind": "timeout" if isinstance(e, TimeoutError) else "crash", "step": getattr(e, "step", None)}
+
+
+def _finish(index, parameters, digest, result, output):
+    # rebuild parts returned through shared memory
+    if output is None:
+        result["parts"] = {part: pp.receive_part(handle)[0] for part, handle in result["parts"].items()}
+    return {"index": index, "parameters": parameters, "digest": digest, "error": None, **result}
+
+
+def sweep(variants, parts=None, max_workers=None, output=None, formats=("stl",), max_pending=None,
+          max_tasks_per_worker=None, max_rss=None, part_budget=None, failures=FAILURE_CACHE, journal=None):
+    """
+    Build the requested parts of every variant on a worker pool.
+
+    Variants that fail the parametric_box.__init__ validation or the geometric
+    rules of parametric_feasibility.box_dimensions are not built and are
+    reported as "infeasible". Results are yielded as soon as they are
+    available, in completion order; only max_pending variants are in flight, so
+    long (or endless) variant generators are fine.
+
+    Parameters:
+    variants (iterable): parameter dicts (see grid and random_sample).
+    parts (list): part method names (default: box.part_names).
+    max_workers (int): number of worker processes (default: number of cores);
+                       1 builds in the calling process.
+    output (str): when set, parts are exported to this directory as
+                  variant_<index>_<part>.<format> instead of returned.
+    formats (list): export formats when output is set.
+    max_pending (int): variants in flight (default: 2 per worker).
+    max_tasks_per_worker (int), max_rss (int): memory bounded mode, workers are
+                   replaced after this many variants or when their RSS exceeds
+                   max_rss KB after a variant (see parametric_parallel.worker_pool);
+                   best combined with output, so no part is held in memory.
+    part_budget (float): seconds allowed to each part build (and to its
+                   export); a part running longer is aborted (its worker is killed) and the variant
+                   fails with kind "timeout". Builds run in worker processes,
+                   even with max_workers=1.
+    failures (failure_cache): part build failures are recorded there, and
+                   variants with a known failure of a requested part are
+                   skipped without building (None: no cache).
+    journal (str or sweep_journal): resumable sweep, every completed variant
+                   is journaled; variants found in the journal (with their
+                   exported files) are yielded from it without building.
+                   Needs output.
+
+    Returns:
+    generator: dicts with index, parameters, digest (box_parameters digest, a
+    stable key for catalogs; None when infeasible), status ("ok", "infeasible"
+    or "failed"), error, parts (part -> Part, or part -> paths), timings and
+    memory (part -> peak RSS of the worker during the part build, KB). Failed
+    results also have kind ("error", "timeout", "crash" or "export"), step (the
+    failing part, or "<part> export" when its export timed out or crashed)
+    and cached (True when skipped as a known failure). Results read from the
+    journal have resumed set to True.
+    """
+    if isinstance(journal, str):
+        journal = sweep_journal(journal)
+    if journal is not None and output is None:
+        raise ValueError("A sweep journal needs an output directory (parts in memory cannot be resumed)")
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+
+    def skipped(index, parameters):
+        # (infeasible, journaled or known failure result, or None; parameter digest)
+        if journal is not None:
+            entry = journal.get(journal.key(index, parameters, parts, formats))
+            if entry is not None:
+                result = {name: value for name, value in entry.items() if name != "key" and value is not None}
+                return {"parameters": parameters, "error": None, "digest": None, **result, "resumed": True}, None
+        try:
+            digest = pc.box_from_parameters(parameters).parameters().digest
+            violations = pf.box_dimensions(parameters)["violations"]
+            rules = [rule for rule, mask in violations.items() if mask[0]]
+            if rules:
+                raise ValueError(f"Infeasible dimensions ({', '.join(rules)})")
+        except ValueError as e:
+            result = {"index": index, "parameters": parameters, "digest": None, "status": "infeasible",
+                      "error": str(e), "parts": {}, "timings": {}, "memory": {}}
+            if journal is not None:
+                journal.put(journal.key(index, parameters, parts, formats), result)
+            return result, None
+        cls = parameters.get("class", "parametric_box")
+        known = failures.get(cls, digest, parts or pc.box_class(cls).part_names, part_budget) if failures else None
+        if known is not None:
+            return {"index": index, "parameters": parameters, "digest": digest, "status": "failed",
+                    "error": known["error"], "kind": known["kind"], "step": known["part"], "cached": True,
+                    "parts": {}, "timings": {}, "memory": {}}, digest
+        return None, digest
+
+    def finish(index, parameters, digest, result):
+        # only failures of the geometry build of a part are known failures (not its export)
+        cls = parameters.get("class", "parametric_box")
+        if failures is not None and result["status"] == "failed" and result["kind"] != "export" and \
+           result["step"] in (parts or pc.box_class(cls).part_names):
+            failures.put(cls, digest, result["step"], result["kind"], result["error"], part_budget)
+        result = _finish(index, parameters, digest, result, output)
+        if journal is not None:
+            journal.put(journal.key(index, parameters, parts, formats), result)
+        return result
+
+    if max_workers == 1 and not (max_tasks_per_worker or max_rss or part_budget):
+        for index, parameters in enumerate(variants):
+            known, digest = skipped(index, parameters)
+            yield known or finish(index, parameters, digest,
+                                  _build_variant(parameters, parts, output, formats, f"variant_{index}"))
+        return
+
+    multiprocessing.resource_tracker.ensure_running()   # see parametric_parallel.build_parts
+    if max_tasks_per_worker or max_rss or part_budget:
+        pool = pp.worker_pool(max_workers, max_tasks_per_worker, max_rss, part_budget)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    with pool:
+        pending = {}
+        for index, parameters in enumerate(variants):
+            known, digest = skipped(index, parameters)
+            if known:
+                yield known
+                continue
+            future = pool.submit(_build_variant, parameters, parts, output, formats, f"variant_{index}")
+            pending[future] = (index, parameters, digest)
+            # stream results while keeping a bounded number of variants in flight
+            while len(pending) >= max_pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield finish(*pending.pop(future), _pool_result(future))
+        for future in concurrent.futures.as_completed(pending):
+            yield finish(*pending[future], _pool_result(future))
+    return None
@@ -0,0 +1,185 @@
+# GM328A Case - watch mode for the OCP/VSCode viewer
+#
+# Watches a parameter file (and the model code in parametric_case.py) and, after
+# each save, rebuilds the parts whose inputs changed and pushes to the viewer
+# only the parts whose geometry changed. Unchanged features are reused from the
+# previous version of each box (see parametric_box.reuse_features), so editing
+# the lid flange only rebuilds the lid and the wall.
+#
+#   python parametric_watch.py gm328a_parameters.json
+#   python parametric_watch.py --parts top_solid wall_solid --debounce 0.5
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+import traceback
+import parametric_case as pc
+
+DEFAULT_PARAMETERS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gm328a_parameters.json")
+
+# viewer options per part, as in the VSCode script
+PART_OPTIONS = {"board_solid":         {"alpha": 0.5, "color": "#FF0000"},
+                "top_fillet_solid":    {"alpha": 1, "color": "#E6FB04"},
+                "bottom_fillet_solid": {"alpha": 1, "color": "#E6FB04"}}
+DEFAULT_OPTIONS = {"alpha": 1, "color": "#F0F0F010"}
+
+
+def geometry_hash(solid, digits=6):
+    """
+    Digest of the geometry of a solid: volume, area, bounding box, center of
+    mass and topology counts, rounded. Unlike a BREP digest, it does not change
+    when a part is read back from the cache or when later booleans add pcurves
+    to shared edges.
+    """
+    box = solid.bounding_box()
+    summary = [solid.volume, solid.area, *box.min, *box.max, *solid.center(pc.bd.CenterOf.MASS),
+               len(solid.faces()), len(solid.edges()), len(solid.vertices())]
+    return hashlib.sha256(json.dumps([round(value, digits) + 0.0 for value in summary]).encode()).hexdigest()
+
+
+def _ocp_show(solid, name, options):
+    # default viewer, imported on first use
+    from ocp_vscode import show_object
+    show_object(solid, name, options=options)
+    return None
+
+
+class part_watcher():
+    """
+    Rebuild the parts of the boxes of a parameter file after each change and
+    push the changed ones to a viewer.
+
+    Parameters:
+    path (str): JSON parameter file (see parametric_case.load_parameter_file).
+    parts (list): part method names (default: box.part_names).
+    show (callable): show(solid, name, options), default ocp_vscode.show_object.
+    debounce (float): seconds without a new change before rebuilding.
+    gap (float): distance between the boxes in the viewer (placed along -X).
+    """
+    def __init__(self, path, parts=None, show=None, debounce=0.3, gap=20):
+        # instance properties
+        self.path = path
+        self.parts = parts
+        self.show = show or _ocp_show
+        self.debounce = debounce
+        self.gap = gap
+        self.boxes = {}                             # name -> box of the last update
+        self.shown = {}                             # (name, part) -> (solid, geometry hash, offset) in the viewer
+        self._mtimes = self._read_mtimes()
+        return None
+
+    def _watched(self):
+        return (self.path, pc.__file__)
+
+    def _read_mtimes(self):
+        mtimes = {}
+        for path in self._watched():
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except FileNotFoundError:               # being replaced by the editor
+                mtimes[path] = None
+        return mtimes
+
+    def changes(self):
+        """
+        Returns:
+        list: the watched files changed since the last call.
+        """
+        mtimes = self._read_mtimes()
+        changed = [path for path, mtime in mtimes.items() if mtime != self._mtimes.get(path)]
+        self._mtimes = mtimes
+        return changed
+
+    def update(self, reload_code=False):
+        """
+        Rebuild the stale parts and show the ones whose geometry changed.
+
+        Parameters:
+        reload_code (bool): reload parametric_case first (the model code changed;
+                            every feature is rebuilt).
+
+        Returns:
+        dict: {"stale": rebuilt parts, "shown": parts pushed to the viewer,
+        "build": build seconds}, parts as "box.part".
+        """
+        if reload_code:
+            importlib.reload(pc)
+            self.boxes = {}
+        boxes = pc.load_parameter_file(self.path)
+        stale, shown = [], []
+        start = time.perf_counter()
+        offset = 0
+        for name, box in boxes.items():
+            previous = self.boxes.get(name)
+            if previous is not None:
+                box.reuse_features(previous)
+            parts = self.parts or box.part_names
+            stale += [f"{name}.{part}" for part in parts if part in box.part_names and box.stale(part)]
+            solids = {part: getattr(box, part)() for part in parts if part in box.part_names}
+            for part, solid in solids.items():
+                previous = self.shown.get((name, part))
+                if previous is not None and previous[0] is solid and previous[2] == offset:
+                    continue                        # memoized part, not rebuilt
+                digest = geometry_hash(solid)
+                if previous is None or previous[1:] != (digest, offset):
+                    self.show(pc.bd.Pos(-offset, 0, 0) * solid, f"{name} {part}",
+                              PART_OPTIONS.get(part, DEFAULT_OPTIONS))
+                    shown.append(f"{name}.{part}")
+                self.shown[(name, part)] = (solid, digest, offset)
+            offset += box.dim_top.X + self.gap
+        self.boxes = boxes
+        return {"stale": stale, "shown": shown, "build": time.perf_counter() - start}
+
+    def run(self, poll=0.1):
+        """
+        Show every part, then watch the files until interrupted (Ctrl+C).
+        """
+        self._report(self.update(), None)
+        while True:
+            time.sleep(poll)
+            changed = self.changes()
+            if not changed:
+                continue
+            # debounce: wait for the editor to stop writing
+            while True:
+                time.sleep(self.debounce)
+                more = self.changes()
+                if not more:
+                    break
+                changed += more
+            saved = max(mtime for mtime in self._mtimes.values() if mtime is not None)
+            try:
+                result = self.update(reload_code=pc.__file__ in changed)
+            except Exception:
+                # keep the last good parts in the viewer until the next save
+                traceback.print_exc()
+                continue
+            self._report(result, time.time() - saved)
+
+    @staticmethod
+    def _report(result, latency):
+        shown = ", ".join(result["shown"]) or "no geometry change"
+        total = f", {latency:.2f}s from save to viewer" if latency is not None else ""
+        print(f"{len(result['stale'])} parts rebuilt in {result['build']:.2f}s{total}: {shown}", flush=True)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild and show the changed parts after each save.")
+    parser.add_argument("parameters", nargs="?", default=DEFAULT_PARAMETERS, help="JSON parameter file")
+    parser.add_argument("--parts", nargs="+", help="part methods to show (default: all parts of each box)")
+    parser.add_argument("--debounce", type=float, default=0.3, help="seconds to wait for more edits")
+    args = parser.parse_args(argv)
+
+    watcher = part_watcher(args.parameters, args.parts, debounce=args.debounce)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
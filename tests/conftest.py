@@ -0,0 +1,26 @@
+# GM328A Case - test fixtures
+#
+# The scripts import each other as top level modules (import parametric_case as pc)
+import json
+import os
+import sys
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS)
+
+import parametric_case as pc
+
+
+@pytest.fixture(autouse=True)
+def part_cache(tmp_path, monkeypatch):
+    # never read or fill the user's part cache
+    monkeypatch.setattr(pc.PART_CACHE, "directory", str(tmp_path / "part_cache"))
+    return pc.PART_CACHE
+
+
+@pytest.fixture
+def parameters():
+    # name -> parameter dict of the reference parameter file
+    with open(os.path.join(SCRIPTS, "gm328a_parameters.json")) as f:
+        return json.load(f)
@@ -0,0 +1,49 @@
+import os
+from multiprocessing import Pipe
+import build123d as bd
+import pytest
+import parametric_case as pc
+import parametric_parallel as pp
+from parametric_client import receive_message
+from parametric_daemon import build_daemon
+
+
+def _segments():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def _box(self):
+    return bd.Box(1, 2, 3)
+
+
+def _broken(self):
+    raise RuntimeError("BRep_API: command not done")
+
+
+def test_failed_build_unlinks_shared_parts(parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _box)
+    monkeypatch.setattr(pc.gm328A_battery, "wall_solid", _broken)
+    before = _segments()
+    with pytest.raises(RuntimeError):
+        build_daemon().build(pc.box_from_parameters(parameters["battery"]), "battery", ["top_solid", "wall_solid"])
+    assert _segments() == before
+
+
+def test_build_response_round_trip(parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _box)
+    daemon = build_daemon()
+    response = dict(daemon.handle({"op": "build", "box": parameters["battery"], "parts": ["top_solid"]}),
+                    status="ok")
+    client, server = Pipe()
+    daemon._respond(server, response, [handle["name"] for handle in response["parts"].values()])
+    part, shared = pp.receive_part(receive_message(client)["parts"]["top_solid"])
+    assert shared is None and part.volume == pytest.approx(6)
+    assert response["parts"]["top_solid"]["name"] not in _segments()
+
+    # an undelivered response does not leave its segments behind
+    response = daemon.build(pc.box_from_parameters(parameters["battery"]), parts=["top_solid"])
+    client.close()
+    server.close()
+    with pytest.raises(OSError):
+        daemon._respond(server, response, [response["parts"]["top_solid"]["name"]])
+    assert response["parts"]["top_solid"]["name"] not in _segments()
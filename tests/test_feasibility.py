@@ -0,0 +1,37 @@
+import numpy as np
+import parametric_feasibility as pf
+import parametric_sweep as ps
+
+
+def _violated(result):
+    return {rule for rule, mask in result["violations"].items() if mask.any()}
+
+
+def test_reference_boxes_are_feasible(parameters):
+    for name in ("case", "battery"):
+        result = pf.box_dimensions(parameters[name])
+        assert result["feasible"].all() and not _violated(result)
+
+
+def test_snap_deeper_than_the_flange(parameters):
+    result = pf.box_dimensions(dict(parameters["battery"], flange_width_top=0.3))
+    assert not result["feasible"][0]
+    assert "snap_top_too_large" in _violated(result)
+
+
+def test_snap_below_the_wall(parameters):
+    # fused base: no base flange to overlap, the lid flange reaches below the wall
+    fused = dict(parameters["battery"], base_type=0, fillet_type_bottom=1, edge_bottom=[0, 0, 0], flange_width_top=3)
+    result = pf.box_dimensions(dict(fused, flange_height_top=np.array([4.0, 19.0])))
+    assert result["feasible"].tolist() == [True, False]
+    assert _violated(result) == {"snap_top_outside_wall"}
+    assert result["snap_top_z"][1] - result["snap_top_size"][1, 1]/2 < result["wall_z_min"][1]
+
+
+def test_sweep_reports_infeasible_variants(parameters, monkeypatch):
+    def build(*args):
+        raise AssertionError("infeasible variant built")
+    monkeypatch.setattr(ps, "_build_variant", build)
+    result, = ps.sweep([dict(parameters["battery"], flange_width_top=0.3)], parts=["top_solid"], max_workers=1,
+                       failures=None)
+    assert result["status"] == "infeasible" and "snap_top_too_large" in result["error"]
@@ -0,0 +1,52 @@
+import pytest
+import parametric_case as pc
+
+
+def test_sketches_are_memoized(parameters):
+    box = pc.box_from_parameters(parameters["battery"])
+    wall = box._wall_sketch()
+    top = box._top_sketch()
+    assert box._wall_sketch() is wall and box._top_sketch() is top
+    assert box._top_flange_sketch() is box._top_flange_sketch()
+
+    # an in-place edit drops the sketches that read the parameter only
+    box.dim_wall.X += 0.5
+    assert box._wall_sketch() is not wall
+    assert box._top_sketch() is top
+
+
+def _no_wall(self, *args, **kwargs):
+    raise AssertionError("the wall solid was built")
+
+
+def test_parts_are_built_on_access(parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "wall_solid", _no_wall)
+    box = pc.box_from_parameters(parameters["battery"])
+    parts = box.parts()
+    assert list(parts) == list(box.part_names)
+    assert box.stale("top_solid") and box.stale("bottom_solid")
+    assert parts["top_solid"].volume == pytest.approx(5418.03, abs=1e-3)
+    assert parts["top_solid"] is parts["top_solid"]
+    assert not box.stale("top_solid") and box.stale("bottom_solid")
+
+
+def test_incremental_rebuild(parameters):
+    assert pc.affected_features(pc.gm328A_battery, "flange_height_top") == \
+        ["_snap_top_sketch", "_snap_top_solid", "_top_flange_solid", "top_solid", "wall_solid"]
+    parts = ["top_solid", "bottom_solid", "top_fillet_solid"]
+    box = pc.box_from_parameters(parameters["battery"])
+    assert box.rebuild(parts) == parts
+    bottom = box.bottom_solid()
+
+    box.flange_height_top = 5
+    assert box.rebuild(parts) == ["top_solid"]
+    assert box.bottom_solid() is bottom
+
+    edited = pc.box_from_parameters(dict(parameters["battery"], flange_height_top=5))
+    with pc.part_cache_bypass():
+        assert box.top_solid().volume == pytest.approx(edited.top_solid().volume)
+
+    # a new version of the box takes over the unchanged features
+    edited = pc.box_from_parameters(dict(parameters["battery"], flange_height_top=6))
+    edited.reuse_features(box)
+    assert [part for part in parts if edited.stale(part)] == ["top_solid"]
@@ -0,0 +1,49 @@
+import concurrent.futures
+import build123d as bd
+import pytest
+import parametric_case as pc
+
+
+def _no_wall(self, *args, **kwargs):
+    raise AssertionError("the wall solid was built")
+
+
+def test_wall_face_matches_the_wall_solid(parameters):
+    box = pc.box_from_parameters(parameters["battery"])
+    faces = pc.parametric_box.wall_solid(box).faces()
+    leftmost = faces.filter_by(lambda f: abs(f.normal_at().dot(bd.Vector(1, 0, 0))) == 1).sort_by(bd.Axis.X)[0]
+    height, width, center = box.wall_face("-X")
+    assert (height, width) == pytest.approx((leftmost.width, leftmost.length))
+    assert tuple(center) == pytest.approx(tuple(leftmost.center()))
+
+
+def test_case_bottom_does_not_build_the_wall(parameters, monkeypatch):
+    monkeypatch.setattr(pc.parametric_box, "wall_solid", _no_wall)
+    case = pc.box_from_parameters(parameters["case"])
+    assert case.bottom_solid().volume == pytest.approx(12248.382, abs=1e-3)
+
+
+def test_fillet_sweeps_are_shared(parameters):
+    pc.FILLET_ENGINE.clear()
+    box = pc.box_from_parameters(parameters["battery"])
+    with pc.part_cache_bypass():
+        solid = box.top_fillet_solid()
+        sweeps = len(pc.FILLET_ENGINE.sweeps)
+        # another box of the same geometry and parametric_fillet reuse the sweep
+        other = pc.box_from_parameters(parameters["battery"]).top_fillet_solid()
+        fillet, _ = pc.parametric_fillet(1, 1, box).solid()
+    assert other is solid and fillet is solid
+    assert len(pc.FILLET_ENGINE.sweeps) == sweeps
+    assert solid.volume == pytest.approx(733.654, abs=1e-3)
+
+
+def test_concurrent_builds(parameters, monkeypatch):
+    monkeypatch.setattr(pc.PART_CACHE, "enabled", False)
+    box = pc.box_from_parameters(parameters["battery"])
+    other = pc.box_from_parameters(parameters["battery"])
+    jobs = [(box, "top_solid"), (box, "top_solid"), (box, "bottom_solid"), (box, "top_fillet_solid"),
+            (other, "top_solid"), (other, "bottom_fillet_solid")]
+    with concurrent.futures.ThreadPoolExecutor(len(jobs)) as pool:
+        solids = list(pool.map(lambda job: getattr(job[0], job[1])(), jobs))
+    assert solids[0] is solids[1]                   # each feature is built once
+    assert [round(solid.volume, 3) for solid in solids] == [5418.03, 5418.03, 5418.03, 733.654, 5418.03, 744.801]
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+import build123d as bd
+import pytest
+import parametric_case as pc
+import parametric_parallel as pp
+
+
+def _segments():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def _mapped(name):
+    with open("/proc/self/maps") as f:
+        return name in f.read()
+
+
+def _box(self):
+    return bd.Box(1, 2, 3)
+
+
+def _slow_box(self):
+    time.sleep(0.5)
+    return bd.Box(1, 2, 3)
+
+
+def _stuck(self):
+    time.sleep(60)
+    return bd.Box(1, 2, 3)
+
+
+def _broken(self):
+    raise RuntimeError("BRep_API: command not done")
+
+
+def test_shared_part_round_trip():
+    before = _segments()
+    handle = pp.share_part(bd.Box(1, 2, 3), mesh=(1e-3, 0.1))
+    assert handle["name"] in _segments()
+    part, mesh = pp.receive_part(handle)
+    assert part.volume == pytest.approx(6)
+    assert mesh.vertices.shape[1] == 3 and mesh.triangles.shape == (12, 3)
+    assert _segments() == before and _mapped(handle["name"])
+    mesh.close()
+    assert not _mapped(handle["name"])
+
+
+def test_receive_part_failure_closes_segment(monkeypatch):
+    handle = pp.share_part(bd.Box(1, 2, 3))
+    monkeypatch.setattr(pp, "binary_to_part", _broken)
+    with pytest.raises(RuntimeError) as failure:
+        pp.receive_part(handle)                     # its traceback keeps the frames alive
+    assert handle["name"] not in _segments() and not _mapped(handle["name"])
+
+
+def test_build_parts_failure_unlinks_other_parts(parameters, monkeypatch):
+    # the failure is received while the other parts are still being built
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _slow_box)
+    monkeypatch.setattr(pc.gm328A_battery, "wall_solid", _slow_box)
+    monkeypatch.setattr(pc.gm328A_battery, "bottom_solid", _broken)
+    before = _segments()
+    boxes = {"battery": pc.box_from_parameters(parameters["battery"])}
+    with pytest.raises(RuntimeError):
+        pp.build_parts(boxes, ["bottom_solid", "top_solid", "wall_solid"], max_workers=3)
+    assert _segments() == before
+
+
+def test_superseded_async_build_is_killed(parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _stuck)
+    monkeypatch.setattr(pc.gm328A_battery, "bottom_solid", _box)
+    box = pc.box_from_parameters(parameters["battery"])
+    before = _segments()
+
+    async def edit():
+        async with pp.async_builder(max_workers=2) as builder:
+            stale = asyncio.ensure_future(builder.build_parts({"battery": box}, ["top_solid"], key="editor"))
+            await asyncio.sleep(0.5)                # the stale build is running
+            parts = await builder.build_parts({"battery": box}, ["bottom_solid"], key="editor")
+            with pytest.raises(asyncio.CancelledError):
+                await stale
+            return parts, builder.killed
+
+    start = time.monotonic()
+    parts, killed = asyncio.run(edit())
+    assert time.monotonic() - start < 10 and killed == 1
+    assert parts["battery"]["bottom_solid"].volume == pytest.approx(6)
+    assert _segments() == before
+
+
+def test_pool_workers_are_recycled():
+    with pp.worker_pool(max_workers=1, max_tasks=2) as pool:
+        pids = [pool.submit(os.getpid).result() for _ in range(5)]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4] and pool.recycled == 2
+
+    # every worker is over an RSS cap of 1 KB after its job
+    with pp.worker_pool(max_workers=1, max_rss=1) as pool:
+        pids = [pool.submit(os.getpid).result() for _ in range(3)]
+    assert len(set(pids)) == 3 and pool.recycled == 3
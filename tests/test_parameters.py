@@ -0,0 +1,30 @@
+import pickle
+import build123d as bd
+import parametric_case as pc
+
+
+def test_digest_is_stable(parameters):
+    record = pc.box_from_parameters(parameters["battery"]).parameters()
+    # pinned: part caches, failure caches and sweep catalogs are keyed by it
+    assert record.digest == "dcbd9b42c9e42e3548d92f6f0ca98b8a90ccce002fa8841580092c13505a686d"
+    assert record.replace(flange_height_top=4).digest == record.replace(flange_height_top=4.0).digest
+    assert record.replace(dim_top=bd.Vector(37.2, 70.2, 2)).digest == record.digest
+    assert record.replace(flange_height_top=5).digest != record.digest
+
+
+def test_parameters_pickle(parameters):
+    record = pc.box_from_parameters(parameters["case"]).parameters()
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record and copy.digest == record.digest and hash(copy) == hash(record)
+
+
+def test_box_pickle_keeps_instance_edits(parameters):
+    case = pc.box_from_parameters(parameters["case"])
+    case.internal_flange_height = 6
+    case.board.d = bd.Vector(80, 60, 1.6)
+    case.zif.p = case.zif.p + bd.Vector(1, 0, 0)
+    copy = pickle.loads(pickle.dumps(case))
+    assert type(copy) is pc.gm328A_case and copy.parameters() == case.parameters()
+    assert copy.internal_flange_height == 6
+    assert tuple(copy.board.d) == (80, 60, 1.6)
+    assert tuple(copy.zif.p) == tuple(case.zif.p)
@@ -0,0 +1,19 @@
+import os
+import parametric_case as pc
+
+
+def test_cache_hit_returns_the_same_part(parameters, part_cache, monkeypatch):
+    monkeypatch.setattr(part_cache, "enabled", True)
+    monkeypatch.setattr(part_cache, "hits", 0)
+    monkeypatch.setattr(part_cache, "misses", 0)
+    built = pc.box_from_parameters(parameters["battery"]).top_solid()
+    assert (part_cache.hits, part_cache.misses) == (0, 1)
+    assert len([name for name in os.listdir(part_cache.directory) if name.endswith(".brep")]) == 1
+
+    cached = pc.box_from_parameters(parameters["battery"]).top_solid()
+    assert (part_cache.hits, part_cache.misses) == (1, 1)
+    assert abs(cached.volume - built.volume) < 1e-6 * built.volume
+    assert len(cached.faces()) == len(built.faces())
+
+    pc.box_from_parameters(dict(parameters["battery"], flange_height_top=5)).top_solid()
+    assert (part_cache.hits, part_cache.misses) == (1, 2)
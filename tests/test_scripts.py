@@ -0,0 +1,29 @@
+import importlib.util
+import os
+import sys
+import parametric_case as pc
+from conftest import SCRIPTS
+
+
+def _import_script(filename):
+    spec = importlib.util.spec_from_file_location("script", os.path.join(SCRIPTS, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_vscode_script_import_builds_nothing(parameters, monkeypatch):
+    monkeypatch.delitem(sys.modules, "ocp_vscode", raising=False)
+    events = []
+    token = pc.CACHE_EVENTS.set((lambda cache, hit, key: events.append(key),))
+    try:
+        script = _import_script("GM328A Case - VSCode + OCP.py")
+        boxes = script.boxes()
+    finally:
+        pc.CACHE_EVENTS.reset(token)
+    assert events == [] and "ocp_vscode" not in sys.modules
+    assert all(box.stale(part) for box in boxes.values() for part in box.part_names)
+
+    # the script and the parameter file describe the same boxes
+    for name, box in boxes.items():
+        assert box.parameters() == pc.box_from_parameters(parameters[name]).parameters()
@@ -0,0 +1,52 @@
+import random
+import build123d as bd
+import pytest
+import parametric_case as pc
+
+
+def test_order_edges_closed_loop():
+    loop = list(bd.fillet(bd.Rectangle(40, 30).vertices(), 5).edges())
+    edges = [edge.reversed() if i % 3 == 0 else edge for i, edge in enumerate(loop)]
+    random.Random(6).shuffle(edges)
+    ordered = pc.order_edges(edges)
+    assert len(ordered) == len(loop)
+    for edge, following in zip(ordered, ordered[1:] + ordered[:1]):
+        assert (edge.end_point() - following.start_point()).length < 1e-6
+    assert pc.shape_to_ordered_path(bd.Rectangle(40, 30)).is_closed
+
+
+def test_order_edges_gap():
+    edges = [bd.Line((0, 0), (10, 0)), bd.Line((10, 0), (10, 10)), bd.Line((20, 20), (30, 20))]
+    with pytest.raises(ValueError, match="continuous path"):
+        pc.order_edges(edges)
+
+
+def test_order_edges_open_path_seeded_mid_chain():
+    points = [(0, 0), (10, 0), (10, 10), (20, 10), (20, 20)]
+    path = [bd.Line(a, b) for a, b in zip(points, points[1:])]
+    edges = [path[2], path[0].reversed(), path[3], path[1].reversed()]
+    ordered = pc.order_edges(edges)
+    assert len(ordered) == len(path)
+    for edge, following in zip(ordered, ordered[1:]):
+        assert (edge.end_point() - following.start_point()).length < 1e-6
+    ends = {tuple(ordered[0].start_point()), tuple(ordered[-1].end_point())}
+    assert ends == {(0, 0, 0), (20, 20, 0)}
+
+
+def test_order_edges_branch():
+    edges = [bd.Line((0, 0), (10, 0)), bd.Line((10, 0), (10, 10)), bd.Line((10, 0), (20, 0))]
+    with pytest.raises(ValueError, match="branch"):
+        pc.order_edges(edges)
+
+
+def test_cut_tools_matches_sequential_cuts():
+    solid = bd.Box(40, 30, 10)
+    tools = [bd.Pos(-10, 0, 0) * bd.Cylinder(4, 20), None, bd.Pos(10, 0, 5) * bd.Box(8, 8, 4),
+             bd.Pos(12, 0, 5) * bd.Box(8, 8, 4)]
+    sequential = solid
+    for tool in tools[:1] + tools[2:]:
+        sequential -= tool
+    cut = pc.cut_tools(solid, tools)
+    assert cut.volume == pytest.approx(sequential.volume)
+    assert len(cut.faces()) == len(sequential.faces())
+    assert pc.cut_tools(solid, [None]) is solid
@@ -0,0 +1,78 @@
+import build123d as bd
+import pytest
+import parametric_case as pc
+import parametric_sweep as ps
+
+
+def _box(self):
+    return bd.Box(1, 2, 3)
+
+
+def _broken(self):
+    raise RuntimeError("BRep_API: command not done")
+
+
+@pytest.fixture
+def failures(tmp_path):
+    return ps.failure_cache(str(tmp_path / "failures.jsonl"))
+
+
+def _sweep(variant, parts, output, formats, failures):
+    return list(ps.sweep([variant], parts=parts, max_workers=1, output=str(output), formats=formats,
+                         failures=failures))[0]
+
+
+def test_export_failures_are_not_cached(tmp_path, parameters, failures, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _box)
+    failed = _sweep(parameters["battery"], ["top_solid"], tmp_path, ["xyz"], failures)
+    assert failed["status"] == "failed" and failed["kind"] == "export"
+
+    result = _sweep(parameters["battery"], ["top_solid"], tmp_path, ["stl"], failures)
+    assert result["status"] == "ok" and not result.get("cached")
+    assert (tmp_path / "variant_0_top_solid.stl").is_file()
+
+
+def test_failures_are_cached_per_part(tmp_path, parameters, failures, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _broken)
+    monkeypatch.setattr(pc.gm328A_battery, "wall_solid", _box)
+    failed = _sweep(parameters["battery"], ["top_solid"], tmp_path, ["stl"], failures)
+    assert (failed["status"], failed["kind"], failed["step"]) == ("failed", "error", "top_solid")
+
+    known = _sweep(parameters["battery"], ["top_solid", "wall_solid"], tmp_path, ["stl"], failures)
+    assert known["cached"] and known["step"] == "top_solid"
+
+    other = _sweep(parameters["battery"], ["wall_solid"], tmp_path, ["stl"], failures)
+    assert other["status"] == "ok" and not other.get("cached")
+
+
+def test_failed_variants_are_reported(parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _broken)
+    result, = ps.sweep([parameters["battery"]], parts=["top_solid"], max_workers=1, failures=None)
+    assert result["status"] == "failed"
+    assert result["error"] == "RuntimeError: BRep_API: command not done"
+    assert result["parts"] == {}
+
+
+def test_journal_resumes_unfinished_variants(tmp_path, parameters, monkeypatch):
+    monkeypatch.setattr(pc.gm328A_battery, "top_solid", _box)
+    variants = list(ps.grid(parameters["battery"], {"flange_height_top": [3, 4, 5]}))
+    journal = str(tmp_path / "journal.jsonl")
+    run = lambda: ps.sweep(variants, parts=["top_solid"], max_workers=1, output=str(tmp_path), failures=None,
+                           journal=journal)
+    interrupted = run()
+    assert [next(interrupted)["index"] for _ in range(2)] == [0, 1]
+    interrupted.close()
+
+    built = []
+    build_variant = ps._build_variant
+    monkeypatch.setattr(ps, "_build_variant", lambda *args: built.append(args[-1]) or build_variant(*args))
+    results = {result["index"]: result for result in run()}
+    assert built == ["variant_2"]
+    assert results[0]["resumed"] and results[1]["resumed"] and not results[2].get("resumed")
+    assert all(result["status"] == "ok" for result in results.values())
+
+    # a journaled variant whose files are gone is built again
+    (tmp_path / "variant_0_top_solid.stl").unlink()
+    built.clear()
+    list(run())
+    assert built == ["variant_0"]
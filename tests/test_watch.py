@@ -0,0 +1,32 @@
+import json
+import os
+import parametric_watch as pw
+
+
+def _write(path, parameters, mtime):
+    with open(path, "w") as f:
+        json.dump(parameters, f)
+    os.utime(path, (mtime, mtime))                  # a distinct mtime, whatever the file system resolution
+    return None
+
+
+def test_watch_shows_changed_parts_only(tmp_path, parameters):
+    path = str(tmp_path / "parameters.json")
+    _write(path, {"battery": parameters["battery"]}, 1000)
+    shown = []
+    watcher = pw.part_watcher(path, parts=["top_solid", "bottom_solid"],
+                              show=lambda solid, name, options: shown.append(name))
+    assert watcher.update()["shown"] == ["battery.top_solid", "battery.bottom_solid"]
+    assert shown == ["battery top_solid", "battery bottom_solid"]
+    assert watcher.changes() == []
+
+    _write(path, {"battery": dict(parameters["battery"], flange_height_top=5)}, 2000)
+    assert watcher.changes() == [path]
+    result = watcher.update()
+    assert result["stale"] == ["battery.top_solid"] and result["shown"] == ["battery.top_solid"]
+
+    # a save without a geometry change shows nothing
+    _write(path, {"battery": dict(parameters["battery"], flange_height_top=5.0)}, 3000)
+    assert watcher.changes() == [path]
+    result = watcher.update()
+    assert result["stale"] == [] and result["shown"] == []